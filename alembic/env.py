@@ -10,9 +10,15 @@ from app.core.database import Base
 
 # ✅ Import all your models so that Alembic sees them
 from app.auth.models import User, UserRole, PasswordResetToken
-from app.products.models import Product
-from app.cart.models import Cart
-from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.models import Product, ProductStockBucket, ProductFacet, ProductCoOccurrence, RelatedProduct, RelatedProductsRun, ProductSalesDaily, InventoryFeedSource, ProductTombstone
+from app.categories.models import Category
+from app.cart.models import Cart, StockReservation
+from app.orders.models import Order, OrderItem, OrderStatus, OrderArchive, OrderItemArchive
+from app.checkout.models import CheckoutJob, CheckoutJobStatus
+from app.analytics.models import SalesDaily, CategorySalesDaily, ProductRevenueDaily, CustomerSalesDaily
+from app.promotions.models import Promotion, PromotionKind
+from app.idempotency.models import IdempotencyKey, IdempotencyStatus
+from app.maintenance.models import RetentionStat
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,33 @@
+"""add retention indexes
+
+Revision ID: 1b7e4f9c2a58
+Revises: 6a1d5c8f3b29
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e4f9c2a58'
+down_revision: Union[str, None] = '6a1d5c8f3b29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing cart lines start their idle clock at migration time
+    op.add_column('cart', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index(op.f('ix_cart_updated_at'), 'cart', ['updated_at'], unique=False)
+    op.create_index('ix_password_reset_tokens_used_expiration_time', 'password_reset_tokens', ['used', 'expiration_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_password_reset_tokens_used_expiration_time', table_name='password_reset_tokens')
+    op.drop_index(op.f('ix_cart_updated_at'), table_name='cart')
+    op.drop_column('cart', 'updated_at')
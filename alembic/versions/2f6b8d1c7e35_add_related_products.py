@@ -0,0 +1,57 @@
+"""add related products
+
+Revision ID: 2f6b8d1c7e35
+Revises: 9e4a2c7d5f18
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6b8d1c7e35'
+down_revision: Union[str, None] = '9e4a2c7d5f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_co_occurrences',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('related_product_id', sa.Integer(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('product_id', 'related_product_id')
+    )
+    op.create_table(
+        'related_products',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('related_product_id', sa.Integer(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'rank')
+    )
+    op.create_table(
+        'related_products_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('from_order_id', sa.Integer(), nullable=False),
+        sa.Column('to_order_id', sa.Integer(), nullable=False),
+        sa.Column('orders_processed', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('from_order_id')
+    )
+    # Backfill afterwards with: python -m app.products.related
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('related_products_runs')
+    op.drop_table('related_products')
+    op.drop_table('product_co_occurrences')
@@ -0,0 +1,44 @@
+"""add checkout jobs
+
+Revision ID: 3a7c1f2b9d40
+Revises: e19dc29546b0
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c1f2b9d40'
+down_revision: Union[str, None] = 'e19dc29546b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'checkout_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'PROCESSING', 'DONE', name='checkoutjobstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('order_id')
+    )
+    op.create_index(op.f('ix_checkout_jobs_id'), 'checkout_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_checkout_jobs_status'), 'checkout_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_checkout_jobs_status'), table_name='checkout_jobs')
+    op.drop_index(op.f('ix_checkout_jobs_id'), table_name='checkout_jobs')
+    op.drop_table('checkout_jobs')
+    sa.Enum(name='checkoutjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,42 @@
+"""add product change feed
+
+Revision ID: 3e9b7d2a5c41
+Revises: 8f5a3c1e6d92
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9b7d2a5c41'
+down_revision: Union[str, None] = '8f5a3c1e6d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing products start at version 0, so a first sync from no cursor returns them all
+    op.add_column('products', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('products', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index('ix_products_version_id', 'products', ['version', 'id'], unique=False)
+    op.create_table('product_tombstones',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_tombstones_version_product_id', 'product_tombstones', ['version', 'product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_tombstones_version_product_id', table_name='product_tombstones')
+    op.drop_table('product_tombstones')
+    op.drop_index('ix_products_version_id', table_name='products')
+    op.drop_column('products', 'updated_at')
+    op.drop_column('products', 'version')
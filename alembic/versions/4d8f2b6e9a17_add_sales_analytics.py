@@ -0,0 +1,63 @@
+"""add sales analytics
+
+Revision ID: 4d8f2b6e9a17
+Revises: 7c3e9a5b2d64
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8f2b6e9a17'
+down_revision: Union[str, None] = '7c3e9a5b2d64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table(
+        'category_sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'category')
+    )
+    op.create_table(
+        'product_revenue_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_table(
+        'customer_sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'user_id')
+    )
+    # Backfill afterwards with: python -m app.analytics.rollup
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('customer_sales_daily')
+    op.drop_table('product_revenue_daily')
+    op.drop_table('category_sales_daily')
+    op.drop_table('sales_daily')
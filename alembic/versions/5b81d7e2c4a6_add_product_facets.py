@@ -0,0 +1,49 @@
+"""add product facets
+
+Revision ID: 5b81d7e2c4a6
+Revises: c5f09a3e7b12
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b81d7e2c4a6'
+down_revision: Union[str, None] = 'c5f09a3e7b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Default FACET_PRICE_BOUNDS when this revision was written. The backfill is frozen to them so
+# that replaying the migration always produces the same rows; deployments with other bounds
+# repair the table afterwards with `python -m app.products.facets`.
+PRICE_BOUNDS = (0, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_facets',
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('price_bucket', sa.Integer(), nullable=False),
+        sa.Column('product_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('category', 'price_bucket')
+    )
+    # Backfill from the existing catalog: admin updates and deletes decrement the old cell
+    price_bucket = "CASE " + " ".join(
+        f"WHEN price >= {bound} THEN {index}" for index, bound in reversed(list(enumerate(PRICE_BOUNDS)))
+    ) + " ELSE 0 END"
+    op.execute(
+        "INSERT INTO product_facets (category, price_bucket, product_count) "
+        "SELECT category, price_bucket, COUNT(*) FROM ("
+        f"SELECT category, {price_bucket} AS price_bucket FROM products"
+        ") AS cells GROUP BY category, price_bucket"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_facets')
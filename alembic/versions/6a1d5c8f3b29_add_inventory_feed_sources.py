@@ -0,0 +1,34 @@
+"""add inventory feed sources
+
+Revision ID: 6a1d5c8f3b29
+Revises: 4d8f2b6e9a17
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1d5c8f3b29'
+down_revision: Union[str, None] = '4d8f2b6e9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'inventory_feed_sources',
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('last_sequence', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('inventory_feed_sources')
@@ -0,0 +1,41 @@
+"""add product popularity
+
+Revision ID: 7c3e9a5b2d64
+Revises: 2f6b8d1c7e35
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9a5b2d64'
+down_revision: Union[str, None] = '2f6b8d1c7e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('popularity', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_products_popularity'), 'products', ['popularity'], unique=False)
+    op.create_table(
+        'product_sales_daily',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.create_index(op.f('ix_product_sales_daily_day'), 'product_sales_daily', ['day'], unique=False)
+    # The first rollup run backfills the whole window
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_sales_daily_day'), table_name='product_sales_daily')
+    op.drop_table('product_sales_daily')
+    op.drop_index(op.f('ix_products_popularity'), table_name='products')
+    op.drop_column('products', 'popularity')
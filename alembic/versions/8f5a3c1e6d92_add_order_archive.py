@@ -0,0 +1,80 @@
+"""add order archive
+
+Revision ID: 8f5a3c1e6d92
+Revises: 1b7e4f9c2a58
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f5a3c1e6d92'
+down_revision: Union[str, None] = '1b7e4f9c2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Month partitions are created by the archival job; the default partition catches the rest
+        op.execute("""
+            CREATE TABLE orders_archive (
+                id INTEGER NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                user_id INTEGER NOT NULL,
+                total_amount FLOAT NOT NULL,
+                status orderstatus,
+                archived_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        op.execute("CREATE TABLE orders_archive_default PARTITION OF orders_archive DEFAULT")
+        op.execute("""
+            CREATE TABLE order_items_archive (
+                id INTEGER NOT NULL,
+                order_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                order_id INTEGER NOT NULL,
+                product_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                price_at_purchase FLOAT NOT NULL,
+                PRIMARY KEY (id, order_created_at)
+            ) PARTITION BY RANGE (order_created_at)
+        """)
+        op.execute("CREATE TABLE order_items_archive_default PARTITION OF order_items_archive DEFAULT")
+    else:
+        op.create_table(
+            'orders_archive',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('total_amount', sa.Float(), nullable=False),
+            sa.Column('status', sa.Enum('PENDING', 'PAID', 'CANCELLED', name='orderstatus'), nullable=True),
+            sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+            sa.PrimaryKeyConstraint('id', 'created_at')
+        )
+        op.create_table(
+            'order_items_archive',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('order_created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('price_at_purchase', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id', 'order_created_at')
+        )
+    op.create_index('ix_orders_archive_user_id_created_at', 'orders_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_order_items_archive_order_id'), 'order_items_archive', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_archive_order_id'), table_name='order_items_archive')
+    op.drop_index('ix_orders_archive_user_id_created_at', table_name='orders_archive')
+    # Dropping a partitioned table drops its partitions
+    op.drop_table('order_items_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,56 @@
+"""add categories
+
+Revision ID: 9e4a2c7d5f18
+Revises: 5b81d7e2c4a6
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a2c7d5f18'
+down_revision: Union[str, None] = '5b81d7e2c4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['parent_id'], ['categories.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=True)
+    op.create_index(op.f('ix_categories_parent_id'), 'categories', ['parent_id'], unique=False)
+    op.create_index('ix_categories_path', 'categories', ['path'], unique=False, postgresql_ops={'path': 'text_pattern_ops'})
+
+    op.add_column('products', sa.Column('category_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_products_category_id'), 'products', ['category_id'], unique=False)
+    op.create_foreign_key('fk_products_category_id', 'products', 'categories', ['category_id'], ['id'])
+
+    # Data migration: every distinct free-text category becomes a top-level category
+    op.execute("INSERT INTO categories (name, path) SELECT DISTINCT category, '' FROM products")
+    op.execute("UPDATE categories SET path = '/' || CAST(id AS VARCHAR) || '/'")
+    op.execute("UPDATE products SET category_id = (SELECT categories.id FROM categories WHERE categories.name = products.category)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_products_category_id', 'products', type_='foreignkey')
+    op.drop_index(op.f('ix_products_category_id'), table_name='products')
+    op.drop_column('products', 'category_id')
+    op.drop_index('ix_categories_path', table_name='categories')
+    op.drop_index(op.f('ix_categories_parent_id'), table_name='categories')
+    op.drop_index(op.f('ix_categories_name'), table_name='categories')
+    op.drop_index(op.f('ix_categories_id'), table_name='categories')
+    op.drop_table('categories')
@@ -0,0 +1,58 @@
+"""add promotions
+
+Revision ID: a4c8e1f6b3d7
+Revises: 3e9b7d2a5c41
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e1f6b3d7'
+down_revision: Union[str, None] = '3e9b7d2a5c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'promotions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('code', sa.String(), nullable=True),
+        sa.Column('kind', sa.Enum('PERCENTAGE', 'FIXED', 'BUY_X_GET_Y', name='promotionkind'), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('buy_quantity', sa.Integer(), nullable=True),
+        sa.Column('get_quantity', sa.Integer(), nullable=True),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('priority', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('active', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_promotions_id'), 'promotions', ['id'], unique=False)
+    op.create_index(op.f('ix_promotions_code'), 'promotions', ['code'], unique=True)
+    op.create_index(op.f('ix_promotions_product_id'), 'promotions', ['product_id'], unique=False)
+    op.create_index(op.f('ix_promotions_category_id'), 'promotions', ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_promotions_category_id'), table_name='promotions')
+    op.drop_index(op.f('ix_promotions_product_id'), table_name='promotions')
+    op.drop_index(op.f('ix_promotions_code'), table_name='promotions')
+    op.drop_index(op.f('ix_promotions_id'), table_name='promotions')
+    op.drop_table('promotions')
+    sa.Enum(name='promotionkind').drop(op.get_bind(), checkfirst=True)
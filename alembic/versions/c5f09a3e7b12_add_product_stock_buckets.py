@@ -0,0 +1,39 @@
+"""add product stock buckets
+
+Revision ID: c5f09a3e7b12
+Revises: 8d2e4b6f1a93
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f09a3e7b12'
+down_revision: Union[str, None] = '8d2e4b6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('is_hot', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index(op.f('ix_products_is_hot'), 'products', ['is_hot'], unique=False)
+    op.create_table(
+        'product_stock_buckets',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_stock_buckets')
+    op.drop_index(op.f('ix_products_is_hot'), table_name='products')
+    op.drop_column('products', 'is_hot')
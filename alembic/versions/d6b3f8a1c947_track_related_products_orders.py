@@ -0,0 +1,36 @@
+"""track related products orders
+
+Revision ID: d6b3f8a1c947
+Revises: c2f7a9d4e815
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6b3f8a1c947'
+down_revision: Union[str, None] = 'c2f7a9d4e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('related_counted', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('ix_orders_status_related_counted', 'orders', ['status', 'related_counted'], unique=False)
+    # Earlier runs counted every order up to their watermark whatever its status, so cancelled
+    # ones among them are subtracted on the next run
+    op.execute(
+        "UPDATE orders SET related_counted = "
+        "(id <= COALESCE((SELECT MAX(to_order_id) FROM related_products_runs), 0))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_status_related_counted', table_name='orders')
+    op.drop_column('orders', 'related_counted')
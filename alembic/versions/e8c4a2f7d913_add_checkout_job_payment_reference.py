@@ -0,0 +1,32 @@
+"""add checkout job payment reference
+
+Revision ID: e8c4a2f7d913
+Revises: d6b3f8a1c947
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4a2f7d913'
+down_revision: Union[str, None] = 'd6b3f8a1c947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TYPE checkoutjobstatus ADD VALUE IF NOT EXISTS 'FAILED'")
+    op.add_column('checkout_jobs', sa.Column('payment_reference', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('checkout_jobs', 'payment_reference')
+    # Postgres cannot drop an enum value: failed jobs are closed as done instead
+    op.execute("UPDATE checkout_jobs SET status = 'DONE' WHERE status = 'FAILED'")
@@ -0,0 +1,34 @@
+"""add retention stats
+
+Revision ID: f2d7b5a9c318
+Revises: e8c4a2f7d913
+Create Date: 2026-10-20 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d7b5a9c318'
+down_revision: Union[str, None] = 'e8c4a2f7d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'retention_stats',
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('reclaimed', sa.BigInteger(), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('retention_stats')
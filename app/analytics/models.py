@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Float, Date
+from app.core.database import Base
+
+# Daily rollups of paid orders, rebuilt by app.analytics.rollup
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class CategorySalesDaily(Base):
+    __tablename__ = "category_sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class ProductRevenueDaily(Base):
+    __tablename__ = "product_revenue_daily"
+    
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class CustomerSalesDaily(Base):
+    __tablename__ = "customer_sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
@@ -0,0 +1,92 @@
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, try_job_lock, utc_date
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.analytics.models import SalesDaily, CategorySalesDaily, ProductRevenueDaily, CustomerSalesDaily
+from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.models import Product
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+def _paid_items(since: Optional[date], *columns):
+    """Select the order day (UTC) and `columns` over the items of paid orders created on or after `since`"""
+    day = utc_date(Order.created_at)
+    query = select(day, *columns).select_from(Order).join(OrderItem, OrderItem.order_id == Order.id).where(
+        Order.status == OrderStatus.PAID
+    )
+    if since is not None:
+        query = query.where(Order.created_at >= datetime.combine(since, time.min, tzinfo=timezone.utc))
+    return query
+
+def rollup_analytics(db: Session, since: Optional[date] = None) -> date:
+    """Rebuild the daily rollup rows from `since` onwards (default: a lookback before the latest rolled-up day).
+
+    Days are rebuilt from the orders of those days only, so a run costs O(recent orders).
+    Orders paid or cancelled after their day fell out of the lookback are only picked up
+    by an explicit rebuild from an earlier date. Days are UTC. Only one worker rebuilds at a
+    time, the others skip their run.
+    """
+    if not try_job_lock(db, "analytics-rollup"):
+        db.rollback()
+        return since
+
+    if since is None:
+        latest_day = db.query(func.max(SalesDaily.day)).scalar()
+        if latest_day is not None:
+            since = latest_day - timedelta(days=settings.ANALYTICS_ROLLUP_LOOKBACK_DAYS)
+
+    revenue = func.sum(OrderItem.quantity * OrderItem.price_at_purchase)
+    units = func.sum(OrderItem.quantity)
+    orders = func.count(distinct(Order.id))
+    category = func.coalesce(Product.category, "Unknown")
+    day = utc_date(Order.created_at)
+    sources = {
+        SalesDaily: _paid_items(since, orders, units, revenue).group_by(day),
+        CategorySalesDaily: _paid_items(since, category, units, revenue).outerjoin(
+            Product, Product.id == OrderItem.product_id
+        ).group_by(day, category),
+        ProductRevenueDaily: _paid_items(since, OrderItem.product_id, units, revenue).group_by(
+            day, OrderItem.product_id
+        ),
+        CustomerSalesDaily: _paid_items(since, Order.user_id, orders, revenue).group_by(
+            day, Order.user_id
+        ),
+    }
+
+    for model, source in sources.items():
+        stale = delete(model)
+        if since is not None:
+            stale = stale.where(model.day >= since)
+        db.execute(stale)
+        columns = [column.name for column in model.__table__.columns]
+        db.execute(insert(model).from_select(columns, source))
+
+    db.commit()
+
+    logger.info(f"Sales analytics rolled up since {since or 'the first order'}")
+    return since
+
+def refresh_analytics() -> bool:
+    db = SessionLocal()
+    try:
+        rollup_analytics(db)
+        return False
+    finally:
+        db.close()
+
+def register_analytics_rollup():
+    """Register the periodic job that keeps the analytics rollups current"""
+    register_task("analytics-rollup", refresh_analytics, settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    # Rebuild from a date (or everything): python -m app.analytics.rollup [YYYY-MM-DD]
+    db = SessionLocal()
+    try:
+        rollup_analytics(db, date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else date.min)
+    finally:
+        db.close()
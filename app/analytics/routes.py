@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.analytics.models import SalesDaily, CategorySalesDaily, ProductRevenueDaily, CustomerSalesDaily
+from app.analytics.schemas import RevenueReport, CategoryRevenueReport, ProductRevenueReport, CustomerRevenueReport
+from app.auth.models import User
+from app.products.models import Product
+from app.middlewares.auth_middleware import get_admin_user
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def report_range(start: Optional[date], end: Optional[date]) -> tuple:
+    """Resolve the report date range, defaulting to the last 30 days"""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "start must not be after end", "code": 400}
+        )
+    return start, end
+
+def average(revenue: float, orders: int) -> float:
+    return round(revenue / orders, 2) if orders else 0.0
+
+@router.get("/revenue", response_model=RevenueReport)
+def get_revenue(start: Optional[date] = Query(None),end: Optional[date] = Query(None),
+                db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get revenue and average order value per day (Admin only)"""
+    start, end = report_range(start, end)
+    
+    rows = db.query(SalesDaily).filter(SalesDaily.day.between(start, end)).order_by(SalesDaily.day).all()
+    orders = sum(row.orders for row in rows)
+    revenue = sum(row.revenue for row in rows)
+    
+    return RevenueReport(
+        start=start,
+        end=end,
+        days=[
+            {"day": row.day, "orders": row.orders, "units": row.units, "revenue": row.revenue,
+             "average_order_value": average(row.revenue, row.orders)}
+            for row in rows
+        ],
+        orders=orders,
+        revenue=revenue,
+        average_order_value=average(revenue, orders)
+    )
+
+@router.get("/categories", response_model=CategoryRevenueReport)
+def get_category_revenue(start: Optional[date] = Query(None),end: Optional[date] = Query(None),
+                         db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get revenue per category (Admin only)"""
+    start, end = report_range(start, end)
+    
+    revenue = func.sum(CategorySalesDaily.revenue)
+    rows = db.query(CategorySalesDaily.category, func.sum(CategorySalesDaily.units), revenue).filter(
+        CategorySalesDaily.day.between(start, end)
+    ).group_by(CategorySalesDaily.category).order_by(revenue.desc()).all()
+    
+    return CategoryRevenueReport(
+        start=start,
+        end=end,
+        categories=[{"category": category, "units": units, "revenue": total} for category, units, total in rows]
+    )
+
+@router.get("/products", response_model=ProductRevenueReport)
+def get_product_revenue(start: Optional[date] = Query(None),end: Optional[date] = Query(None),
+                        limit: int = Query(20, ge=1, le=100),
+                        db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get the top products by revenue (Admin only)"""
+    start, end = report_range(start, end)
+    
+    revenue = func.sum(ProductRevenueDaily.revenue)
+    rows = db.query(ProductRevenueDaily.product_id, func.sum(ProductRevenueDaily.units), revenue).filter(
+        ProductRevenueDaily.day.between(start, end)
+    ).group_by(ProductRevenueDaily.product_id).order_by(revenue.desc()).limit(limit).all()
+    names = dict(db.query(Product.id, Product.name).filter(Product.id.in_([row[0] for row in rows])).all())
+    
+    return ProductRevenueReport(
+        start=start,
+        end=end,
+        products=[
+            {"product_id": product_id, "product_name": names.get(product_id), "units": units, "revenue": total}
+            for product_id, units, total in rows
+        ]
+    )
+
+@router.get("/customers", response_model=CustomerRevenueReport)
+def get_top_customers(start: Optional[date] = Query(None),end: Optional[date] = Query(None),
+                      limit: int = Query(20, ge=1, le=100),
+                      db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get the top customers by revenue (Admin only)"""
+    start, end = report_range(start, end)
+    
+    revenue = func.sum(CustomerSalesDaily.revenue)
+    rows = db.query(CustomerSalesDaily.user_id, func.sum(CustomerSalesDaily.orders), revenue).filter(
+        CustomerSalesDaily.day.between(start, end)
+    ).group_by(CustomerSalesDaily.user_id).order_by(revenue.desc()).limit(limit).all()
+    emails = dict(db.query(User.id, User.email).filter(User.id.in_([row[0] for row in rows])).all())
+    
+    return CustomerRevenueReport(
+        start=start,
+        end=end,
+        customers=[
+            {"user_id": user_id, "email": emails.get(user_id), "orders": orders, "revenue": total}
+            for user_id, orders, total in rows
+        ]
+    )
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class DailyRevenue(BaseModel):
+    day: date
+    orders: int
+    units: int
+    revenue: float
+    average_order_value: float
+
+class RevenueReport(BaseModel):
+    start: date
+    end: date
+    days: List[DailyRevenue]
+    orders: int
+    revenue: float
+    average_order_value: float
+
+class CategoryRevenue(BaseModel):
+    category: str
+    units: int
+    revenue: float
+
+class CategoryRevenueReport(BaseModel):
+    start: date
+    end: date
+    categories: List[CategoryRevenue]
+
+class ProductRevenue(BaseModel):
+    product_id: int
+    product_name: Optional[str]
+    units: int
+    revenue: float
+
+class ProductRevenueReport(BaseModel):
+    start: date
+    end: date
+    products: List[ProductRevenue]
+
+class CustomerRevenue(BaseModel):
+    user_id: int
+    email: Optional[str]
+    orders: int
+    revenue: float
+
+class CustomerRevenueReport(BaseModel):
+    start: date
+    end: date
+    customers: List[CustomerRevenue]
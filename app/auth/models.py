@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum, Index
 # from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -18,6 +18,7 @@ class User(Base):
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
+    __table_args__ = (Index("ix_password_reset_tokens_used_expiration_time", "used", "expiration_time"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -4,7 +4,6 @@ from app.core.database import get_db
 from app.auth.models import User, PasswordResetToken
 from app.auth.schemas import UserSignup, UserSignin, ForgotPassword, ResetPassword, UserResponse, TokenResponse
 from app.auth.utils import get_password_hash, verify_password, create_access_token, create_refresh_token, generate_reset_token
-from app.utils.email import send_reset_email
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
 import logging
@@ -13,7 +12,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
+def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     """User signup endpoint"""
     logger.info(f"Signup attempt for email: {user_data.email}")
     
@@ -43,7 +42,7 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     return new_user
 
 @router.post("/signin", response_model=TokenResponse)
-async def signin(user_data: UserSignin, db: Session = Depends(get_db)):
+def signin(user_data: UserSignin, db: Session = Depends(get_db)):
     """User signin endpoint"""
     logger.info(f"Signin attempt for email: {user_data.email}")
     
@@ -93,14 +92,15 @@ async def forgot_password(request: ForgotPassword, db: Session = Depends(get_db)
     db.add(reset_token_obj)
     db.commit()
     
-    # Send email
+    # Send email (smtplib and the MIME stack are only imported when needed)
+    from app.utils.email import send_reset_email
     await send_reset_email(user.email, reset_token)
     
     logger.info(f"Password reset token generated for user: {request.email}")
     return {"message": "Password reset link has been sent. Please check your email."}
 
 @router.post("/reset-password")
-async def reset_password(request: ResetPassword, db: Session = Depends(get_db)):
+def reset_password(request: ResetPassword, db: Session = Depends(get_db)):
     """Reset password endpoint"""
     logger.info(f"Password reset attempt with token")
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
 from app.core.database import Base
@@ -9,4 +9,16 @@ class Cart(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
     product_id = Column(Integer, nullable=False)
-    quantity = Column(Integer, nullable=False, default=1)
\ No newline at end of file
+    quantity = Column(Integer, nullable=False, default=1)
+    # Last change to the line, used to find abandoned carts
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    __table_args__ = (UniqueConstraint("user_id", "product_id", name="uq_stock_reservations_user_product"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
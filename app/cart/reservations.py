@@ -0,0 +1,113 @@
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.cart.models import StockReservation
+from app.products.models import Product
+from app.products.utils import apply_stock_deltas
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _sum_by_product(rows) -> dict:
+    """Aggregate (product_id, quantity) rows into negative reserved deltas"""
+    deltas = defaultdict(int)
+    for product_id, quantity in rows:
+        deltas[product_id] -= quantity
+    return deltas
+
+def reserve_stock(db: Session, user_id: int, product_id: int, quantity: int) -> bool:
+    """Hold `quantity` units of a product for a user's cart line, refreshing the TTL.
+
+    Only the difference to what the user already holds is taken from the available
+    figure, with a conditional UPDATE so two carts can never hold the same unit.
+    The caller commits.
+    """
+    reservation = db.query(StockReservation).filter(
+        StockReservation.user_id == user_id,
+        StockReservation.product_id == product_id
+    ).with_for_update().first()
+
+    held = reservation.quantity if reservation else 0
+    delta = quantity - held
+
+    if delta > 0:
+        reserved = db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock - Product.reserved >= delta)
+            .values(reserved=Product.reserved + delta)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not reserved:
+            return False
+    elif delta < 0:
+        apply_stock_deltas(db, {product_id: delta}, column_name="reserved")
+
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.CART_RESERVATION_TTL_SECONDS)
+    if reservation:
+        reservation.quantity = quantity
+        reservation.expires_at = expires_at
+    else:
+        db.add(StockReservation(
+            user_id=user_id,
+            product_id=product_id,
+            quantity=quantity,
+            expires_at=expires_at
+        ))
+    return True
+
+def release_stock(db: Session, user_id: int, product_ids: list = None) -> int:
+    """Drop a user's reservations (all, or for the given products) and free the units. The caller commits."""
+    statement = delete(StockReservation).where(StockReservation.user_id == user_id)
+    if product_ids is not None:
+        statement = statement.where(StockReservation.product_id.in_(product_ids))
+
+    rows = db.execute(
+        statement.returning(StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    apply_stock_deltas(db, _sum_by_product(rows), column_name="reserved")
+    return len(rows)
+
+def get_held_quantities(db: Session, user_id: int) -> dict:
+    """Get the units a user currently holds per product"""
+    rows = db.query(StockReservation.product_id, StockReservation.quantity).filter(
+        StockReservation.user_id == user_id
+    ).all()
+    return {product_id: quantity for product_id, quantity in rows}
+
+def sweep_expired_reservations() -> bool:
+    """Expire one batch of reservations; returns True when the batch was full"""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        expired_ids = [row[0] for row in db.query(StockReservation.id).filter(
+            StockReservation.expires_at < now
+        ).order_by(StockReservation.expires_at).limit(settings.RESERVATION_SWEEP_BATCH_SIZE).all()]
+
+        if not expired_ids:
+            return False
+
+        # Re-check expiry so reservations refreshed since the scan are kept
+        rows = db.execute(
+            delete(StockReservation)
+            .where(StockReservation.id.in_(expired_ids), StockReservation.expires_at < now)
+            .returning(StockReservation.product_id, StockReservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        apply_stock_deltas(db, _sum_by_product(rows), column_name="reserved")
+        db.commit()
+
+        logger.info(f"Expired {len(rows)} cart reservations")
+        return len(expired_ids) == settings.RESERVATION_SWEEP_BATCH_SIZE
+    finally:
+        db.close()
+
+def register_reservation_sweeper():
+    """Register the background task that expires cart reservations"""
+    register_task("reservation-sweeper", sweep_expired_reservations, settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.config import settings
 from app.cart.models import Cart
-from app.cart.schemas import CartAdd, CartUpdate, CartItemResponse, CartResponse
+from app.cart.reservations import reserve_stock, release_stock
+from app.cart.schemas import CartAdd, CartUpdate, CartItemResponse, CartResponse, CartSummaryResponse
 from app.products.models import Product
+from app.promotions.engine import promotion_index, price_cart_items
+from app.idempotency.store import run_idempotent
 from app.middlewares.auth_middleware import get_current_user
 from app.auth.models import User
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def add_to_cart(cart_data: CartAdd,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
-    """Add item to cart"""
+def add_to_cart(cart_data: CartAdd,response: Response,idempotency_key: Optional[str] = Header(None),db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Add item to cart; with an Idempotency-Key header, retries replay the first response"""
+    return run_idempotent(
+        "add_to_cart", current_user.id, idempotency_key, cart_data, response,
+        lambda: add_item(cart_data, db, current_user), status.HTTP_201_CREATED
+    )
+
+def add_item(cart_data: CartAdd, db: Session, current_user: User) -> dict:
+    """Add a quantity of a product to the user's cart, reserving stock when reservations are enabled"""
     logger.info(f"User {current_user.email} adding to cart - product: {cart_data.product_id}")
     
     # Check if product exists
@@ -24,27 +37,29 @@ async def add_to_cart(cart_data: CartAdd,db: Session = Depends(get_db),current_u
             detail={"error": True, "message": "Product not found", "code": 404}
         )
     
-    # Check stock availability
-    if product.stock < cart_data.quantity:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": True, "message": "Insufficient stock", "code": 400}
-        )
-    
     # Check if item already in cart
     existing_cart_item = db.query(Cart).filter(
         Cart.user_id == current_user.id,
         Cart.product_id == cart_data.product_id
     ).first()
     
+    new_quantity = cart_data.quantity + (existing_cart_item.quantity if existing_cart_item else 0)
+    
+    # Check stock availability
+    if settings.CART_RESERVATIONS_ENABLED:
+        in_stock = reserve_stock(db, current_user.id, cart_data.product_id, new_quantity)
+    else:
+        in_stock = product.stock >= new_quantity
+    
+    if not in_stock:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "Insufficient stock", "code": 400}
+        )
+    
     if existing_cart_item:
         # Update quantity
-        new_quantity = existing_cart_item.quantity + cart_data.quantity
-        if product.stock < new_quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={"error": True, "message": "Insufficient stock.", "code": 400}
-            )
         existing_cart_item.quantity = new_quantity
         db.commit()
         logger.info(f"Cart item updated - new quantity: {new_quantity}")
@@ -62,21 +77,29 @@ async def add_to_cart(cart_data: CartAdd,db: Session = Depends(get_db),current_u
     return {"message": "Item added to cart successfully"}
 
 @router.get("", response_model=CartResponse)
-async def get_cart(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
-    """Get user's cart"""
+def get_cart(coupon: Optional[str] = Query(None),db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Get user's cart with promotions (and the coupon, if given) applied"""
     logger.info(f"User {current_user.email} fetching cart items")
     
     cart_items = db.query(Cart, Product).join(
         Product, Cart.product_id == Product.id
     ).filter(Cart.user_id == current_user.id).all()
     
+    if not cart_items:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Cart is empty", "code": 404}
+        )
+    
+    lines, discount_amount, applied = price_cart_items(cart_items, coupon)
+    
     items = []
-    total_amount = 0
+    subtotal_amount = 0
     total_items = 0
     
-    for cart_item, product in cart_items:
+    for (cart_item, product), line in zip(cart_items, lines):
         subtotal = product.price * cart_item.quantity
-        total_amount += subtotal
+        subtotal_amount += subtotal
         total_items += cart_item.quantity
         
         items.append(CartItemResponse(
@@ -86,22 +109,49 @@ async def get_cart(db: Session = Depends(get_db),current_user: User = Depends(ge
             product_price=product.price,
             quantity=cart_item.quantity,
             subtotal=subtotal,
+            discount=line.discount,
         ))
     
-    if not cart_items:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": True, "message": "Cart is empty", "code": 404}
-        )
-    
     return CartResponse(
         items=items,
         total_items=total_items,
-        total_amount=total_amount
+        subtotal_amount=round(subtotal_amount, 2),
+        discount_amount=discount_amount,
+        total_amount=round(sum(line.total for line in lines), 2),
+        promotions=applied
+    )
+
+@router.get("/summary", response_model=CartSummaryResponse)
+def get_cart_summary(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Get item count and total of the user's cart (for the cart badge)"""
+    
+    if not promotion_index.empty:
+        # Promotions need the individual lines
+        cart_items = db.query(Cart, Product).join(Product, Cart.product_id == Product.id).filter(
+            Cart.user_id == current_user.id
+        ).all()
+        lines, discount_amount, _ = price_cart_items(cart_items)
+        return CartSummaryResponse(
+            distinct_items=len(lines),
+            total_items=sum(line.quantity for line in lines),
+            discount_amount=discount_amount,
+            total_amount=round(sum(line.total for line in lines), 2)
+        )
+    
+    distinct_items, total_items, total_amount = db.query(
+        func.count(Cart.id),
+        func.coalesce(func.sum(Cart.quantity), 0),
+        func.coalesce(func.sum(Cart.quantity * Product.price), 0)
+    ).join(Product, Cart.product_id == Product.id).filter(Cart.user_id == current_user.id).one()
+    
+    return CartSummaryResponse(
+        distinct_items=distinct_items,
+        total_items=total_items,
+        total_amount=round(total_amount, 2)
     )
 
 @router.put("/{product_id}")
-async def update_cart_quantity(product_id: int,cart_data: CartUpdate,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+def update_cart_quantity(product_id: int,cart_data: CartUpdate,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
     """Update cart item quantity"""
     logger.info(f"User {current_user.email} updating cart item: {product_id}")
     
@@ -126,7 +176,13 @@ async def update_cart_quantity(product_id: int,cart_data: CartUpdate,db: Session
         )
     
     # Check stock availability
-    if product.stock < cart_data.quantity:
+    if settings.CART_RESERVATIONS_ENABLED:
+        in_stock = reserve_stock(db, current_user.id, product_id, cart_data.quantity)
+    else:
+        in_stock = product.stock >= cart_data.quantity
+    
+    if not in_stock:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": True, "message": "Insufficient stock", "code": 400}
@@ -140,7 +196,7 @@ async def update_cart_quantity(product_id: int,cart_data: CartUpdate,db: Session
     return {"message": "Cart item updated successfully"}
 
 @router.delete("/{product_id}")
-async def remove_from_cart(product_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+def remove_from_cart(product_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
     """Remove item from cart"""
     logger.info(f"User {current_user.email} removing item from cart: {product_id}")
     
@@ -157,6 +213,8 @@ async def remove_from_cart(product_id: int,db: Session = Depends(get_db),current
         )
     
     db.delete(cart_item)
+    if settings.CART_RESERVATIONS_ENABLED:
+        release_stock(db, current_user.id, [product_id])
     db.commit()
     
     logger.info(f"Cart item removed successfully")
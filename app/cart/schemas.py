@@ -1,5 +1,6 @@
 from pydantic import BaseModel, field_validator
 from fastapi import HTTPException, status
+from app.promotions.schemas import AppliedPromotion
 
 class CartAdd(BaseModel):
     product_id: int
@@ -35,6 +36,7 @@ class CartItemResponse(BaseModel):
     product_price: float
     quantity: int
     subtotal: float
+    discount: float = 0.0
     
     class Config:
         from_attributes = True
@@ -42,4 +44,13 @@ class CartItemResponse(BaseModel):
 class CartResponse(BaseModel):
     items: list[CartItemResponse]
     total_items: int
-    total_amount: float
\ No newline at end of file
+    subtotal_amount: float
+    discount_amount: float = 0.0
+    total_amount: float
+    promotions: list[AppliedPromotion] = []
+
+class CartSummaryResponse(BaseModel):
+    distinct_items: int
+    total_items: int
+    discount_amount: float = 0.0
+    total_amount: float
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+class Category(Base):
+    __tablename__ = "categories"
+    __table_args__ = (
+        # Prefix LIKE on the materialized path needs pattern ops to use the index on Postgres
+        Index("ix_categories_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False, index=True)
+    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    # Materialized path of ancestor ids including this one, e.g. "/1/4/"
+    path = Column(String, nullable=False)
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.categories.models import Category
+from app.categories.schemas import CategoryCreate, CategoryResponse, CategoryListResponse
+from app.categories.utils import create_category
+from app.products.snapshot import catalog_snapshot
+from app.middlewares.auth_middleware import get_admin_user
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Admin Category Routes
+@router.post("/admin/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
+def add_category(category_data: CategoryCreate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Create a category, optionally under a parent (Admin only)"""
+    logger.info(f"Admin {admin_user.email} creating category: {category_data.name}")
+    
+    if db.query(Category).filter(Category.name == category_data.name).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "Category already exists", "code": 400}
+        )
+    
+    parent = None
+    if category_data.parent_id is not None:
+        parent = db.query(Category).filter(Category.id == category_data.parent_id).first()
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"error": True, "message": "Parent category not found", "code": 404}
+            )
+    
+    category = create_category(db, category_data.name, parent)
+    db.commit()
+    db.refresh(category)
+    catalog_snapshot.add_category(category)
+    
+    logger.info(f"Category created successfully")
+    return category
+
+# User Category Routes
+@router.get("/categories", response_model=CategoryListResponse)
+def get_categories(db: Session = Depends(get_db)):
+    """Get all categories ordered as a depth-first tree"""
+    
+    categories = db.query(Category).order_by(Category.path).all()
+    
+    return CategoryListResponse(
+        categories=categories,
+        total=len(categories)
+    )
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional
+from fastapi import HTTPException, status
+
+class CategoryCreate(BaseModel):
+    name: str
+    parent_id: Optional[int] = None
+    
+    @field_validator("name")
+    @classmethod
+    def validate_name(cls, v):
+        if not v.strip():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": True, "message": "Category name cannot be empty", "code": 400}
+            )
+        return v.strip()
+
+class CategoryResponse(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int]
+    path: str
+    
+    class Config:
+        from_attributes = True
+
+class CategoryListResponse(BaseModel):
+    categories: list[CategoryResponse]
+    total: int
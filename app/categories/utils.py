@@ -0,0 +1,33 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.categories.models import Category
+from typing import Optional
+
+def create_category(db: Session, name: str, parent: Optional[Category] = None) -> Category:
+    """Create a category and derive its materialized path from the parent's. The caller commits."""
+    category = Category(name=name, parent_id=parent.id if parent else None, path="")
+    db.add(category)
+    db.flush()
+    category.path = f"{parent.path if parent else '/'}{category.id}/"
+    return category
+
+def get_or_create_category(db: Session, name: str) -> Category:
+    """Find a category by exact name, creating a top-level one if it does not exist"""
+    name = name.strip()
+    category = db.query(Category).filter(Category.name == name).first()
+    return category or create_category(db, name)
+
+def find_category(db: Session, name: str) -> Optional[Category]:
+    return db.query(Category).filter(Category.name == name.strip()).first()
+
+def subtree_ids(category: Category, include_subcategories: bool = True):
+    """Select the ids of a category and, optionally, all of its descendants (an indexed prefix match)"""
+    if not include_subcategories:
+        return select(Category.id).where(Category.id == category.id)
+    return select(Category.id).where(Category.path.like(f"{category.path}%"))
+
+def subtree_names(category: Category, include_subcategories: bool = True):
+    """Select the names of a category and, optionally, all of its descendants"""
+    if not include_subcategories:
+        return select(Category.name).where(Category.id == category.id)
+    return select(Category.name).where(Category.path.like(f"{category.path}%"))
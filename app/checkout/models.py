@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class CheckoutJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+class CheckoutJob(Base):
+    __tablename__ = "checkout_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, unique=True)
+    status = Column(Enum(CheckoutJobStatus), nullable=False, default=CheckoutJobStatus.QUEUED, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    locked_at = Column(DateTime(timezone=True))
+    # Sent with the charge and committed before it, so a retried job cannot charge twice
+    payment_reference = Column(String(64))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
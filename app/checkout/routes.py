@@ -1,20 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, is_deadline_error, shield_from_deadline
+from app.core.config import settings
 from app.cart.models import Cart
+from app.cart.reservations import release_stock
 from app.products.models import Product
+from app.products.inventory import decrement_hot_stock
+from app.products.stream import notify_product_changes
+from app.promotions.engine import price_cart_items
+from app.idempotency.store import mark_irreversible, run_idempotent
 from app.orders.models import Order, OrderItem, OrderStatus
 from app.middlewares.auth_middleware import get_current_user
 from app.auth.models import User
+from app.checkout.models import CheckoutJob
+from app.checkout.schemas import CheckoutStatusResponse
 from app.checkout.utils import process_payment
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("")
-async def checkout(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
-    """Checkout and place order"""
+def checkout(response: Response,coupon: Optional[str] = Query(None),idempotency_key: Optional[str] = Header(None),db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Checkout and place order, applying the current promotions and the coupon, if given.
+
+    With an Idempotency-Key header, retries replay the first response instead of charging again.
+    """
+    return run_idempotent(
+        "checkout", current_user.id, idempotency_key, {"coupon": coupon}, response,
+        lambda: place_order(response, coupon, db, current_user)
+    )
+
+def take_stock(db: Session, current_user: User, cart_items: list) -> Optional[Product]:
+    """Atomically take the cart quantities from stock. The caller commits or rolls back.
+
+    Cart reservations turn into real stock decrements. Products are decremented in id
+    order, so concurrent multi-product checkouts lock their rows in the same order and
+    cannot deadlock. Returns the first product that cannot be covered, or None.
+    """
+    if settings.CART_RESERVATIONS_ENABLED:
+        release_stock(db, current_user.id)
+        available = Product.stock - Product.reserved
+    else:
+        available = Product.stock
+    
+    for cart_item, product in sorted(cart_items, key=lambda row: row[1].id):
+        if product.is_hot:
+            taken = decrement_hot_stock(db, product.id, cart_item.quantity)
+        else:
+            taken = db.query(Product).filter(
+                Product.id == product.id,
+                available >= cart_item.quantity
+            ).update({Product.stock: Product.stock - cart_item.quantity}, synchronize_session=False)
+        if not taken:
+            return product
+    return None
+
+def place_order(response: Response, coupon: Optional[str], db: Session, current_user: User) -> dict:
+    """Hold the stock, charge and write the order (or queue it in async mode)"""
     
     # Get cart items
     cart_items = db.query(Cart, Product).join(
@@ -27,32 +71,30 @@ async def checkout(db: Session = Depends(get_db),current_user: User = Depends(ge
             detail={"error": True, "message": "Cart is empty", "code": 400}
         )
     
-    # Calculate total and validate stock
-    total_amount = 0
-    order_items_data = []
+    if settings.CHECKOUT_MODE == "async":
+        response.status_code = status.HTTP_202_ACCEPTED
+        return queue_checkout(db, current_user, cart_items, coupon)
     
-    for cart_item, product in cart_items:
-        # Check stock availability
-        if product.stock < cart_item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={"error": True, "message": f"Insufficient stock for {product.name}", "code": 400}
-            )
-        
-        subtotal = product.price * cart_item.quantity
-        total_amount += subtotal
-        
-        order_items_data.append({
-            "product_id": product.id,
-            "quantity": cart_item.quantity,
-            "price_at_purchase": product.price,
-            "product": product
-        })
+    lines, discount_amount, applied = price_cart_items(cart_items, coupon)
+    total_amount = round(sum(line.total for line in lines), 2)
     
-    # Process payment
+    # Hold the stock in this transaction before charging, so a paid order can always be written
+    short = take_stock(db, current_user, cart_items)
+    if short is not None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"Insufficient stock for {short.name}", "code": 400}
+        )
+    
+    # Once the card is charged the order must be written: no deadline or disconnect may interrupt it
+    shield_from_deadline(db)
+    # Process payment (a retry with the same Idempotency-Key must not charge again, even if the order write fails)
+    mark_irreversible()
     payment_result = process_payment(total_amount)
     
     if not payment_result["success"]:
+        db.rollback()  # give the held stock back
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": True, "message": "Payment failed", "code": 400}
@@ -68,19 +110,16 @@ async def checkout(db: Session = Depends(get_db),current_user: User = Depends(ge
         db.add(new_order)
         db.flush()  # Ensure order ID is generated
         
-        # Create order items and update stock
-        for item_data in order_items_data:
-            order_item = OrderItem(
+        # Create order items
+        for (cart_item, product), line in zip(cart_items, lines):
+            db.add(OrderItem(
                 order_id=new_order.id,
-                product_id=item_data["product_id"],
-                quantity=item_data["quantity"],
-                price_at_purchase=item_data["price_at_purchase"]
-            )
-            db.add(order_item)
-            
-            # Update product stock
-            product = item_data["product"]
-            product.stock -= item_data["quantity"]
+                product_id=product.id,
+                quantity=cart_item.quantity,
+                price_at_purchase=line.unit_price
+            ))
+        
+        notify_product_changes(db, [product.id for cart_item, product in cart_items])
         
         # Clear cart
         db.query(Cart).filter(Cart.user_id == current_user.id).delete()
@@ -93,13 +132,102 @@ async def checkout(db: Session = Depends(get_db),current_user: User = Depends(ge
             "message": "Checkout successful",
             "order_id": new_order.id,
             "total_amount": total_amount,
+            "discount_amount": discount_amount,
+            "promotions": applied,
             "status": "paid"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
+        if is_deadline_error(e):
+            raise  # answered with a 504 by the deadline handler
         logger.error(f"Checkout failed for user {current_user.email}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": True, "message": "Checkout failed", "code": 500}
         )
+
+def queue_checkout(db: Session, current_user: User, cart_items: list, coupon: Optional[str] = None) -> dict:
+    """Reserve stock, write a PENDING order and queue it for the payment workers"""
+    lines, discount_amount, applied = price_cart_items(cart_items, coupon)
+    total_amount = round(sum(line.total for line in lines), 2)
+    
+    try:
+        new_order = Order(
+            user_id=current_user.id,
+            total_amount=total_amount,
+            status=OrderStatus.PENDING
+        )
+        db.add(new_order)
+        db.flush()
+        
+        short = take_stock(db, current_user, cart_items)
+        if short is not None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": True, "message": f"Insufficient stock for {short.name}", "code": 400}
+            )
+        
+        for (cart_item, product), line in zip(cart_items, lines):
+            db.add(OrderItem(
+                order_id=new_order.id,
+                product_id=product.id,
+                quantity=cart_item.quantity,
+                price_at_purchase=line.unit_price
+            ))
+        
+        db.add(CheckoutJob(order_id=new_order.id))
+        notify_product_changes(db, [product.id for cart_item, product in cart_items])
+        
+        # Clear cart
+        db.query(Cart).filter(Cart.user_id == current_user.id).delete()
+        
+        db.commit()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        if is_deadline_error(e):
+            raise  # answered with a 504 by the deadline handler
+        logger.error(f"Checkout failed for user {current_user.email}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": True, "message": "Checkout failed", "code": 500}
+        )
+    
+    logger.info(f"Checkout queued - Order ID: {new_order.id}, Total: ${total_amount}")
+    
+    return {
+        "message": "Checkout accepted",
+        "order_id": new_order.id,
+        "total_amount": total_amount,
+        "discount_amount": discount_amount,
+        "promotions": applied,
+        "status": "pending",
+        "status_url": f"/checkout/{new_order.id}/status"
+    }
+
+@router.get("/{order_id}/status", response_model=CheckoutStatusResponse)
+def get_checkout_status(order_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Poll the status of a checkout"""
+    
+    order = db.query(Order).filter(
+        Order.id == order_id,
+        Order.user_id == current_user.id
+    ).first()
+    
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Order not found", "code": 404}
+        )
+    
+    return CheckoutStatusResponse(
+        order_id=order.id,
+        status=order.status,
+        total_amount=order.total_amount
+    )
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from app.orders.models import OrderStatus
+
+class CheckoutStatusResponse(BaseModel):
+    order_id: int
+    status: OrderStatus
+    total_amount: float
@@ -1,10 +1,18 @@
+from typing import Optional
 import random
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
-def process_payment(amount: float) -> dict:
+# Results by payment reference, standing in for the provider's idempotency-key store
+_charges = {}
+
+def process_payment(amount: float, reference: Optional[str] = None) -> dict:
+    if reference is not None and reference in _charges:
+        logger.info(f"Payment {reference} already processed")
+        return _charges[reference]
+    
     logger.info(f"Processing payment for amount: ${amount}")
     
     time.sleep(0.5) 
@@ -13,15 +21,19 @@ def process_payment(amount: float) -> dict:
 
     if success:
         logger.info("Payment successful")
-        return {
+        result = {
             "success": True,
             "amount": amount,
             "message": "Payment processed successfully"
         }
     else:
         logger.warning("Payment failed - simulated failure")
-        return {
+        result = {
             "success": False,
             "amount": amount,
             "message": "Payment processing failed"
-        }
\ No newline at end of file
+        }
+    
+    if reference is not None:
+        _charges[reference] = result
+    return result
\ No newline at end of file
@@ -0,0 +1,156 @@
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task, start_tasks, stop_tasks
+from app.checkout.models import CheckoutJob, CheckoutJobStatus
+from app.checkout.utils import process_payment
+from app.orders.models import Order, OrderStatus
+from app.orders.utils import restore_order_stock
+from datetime import datetime, timedelta, timezone
+import logging
+import signal
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+def _abandoned():
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.CHECKOUT_JOB_LOCK_TIMEOUT_SECONDS)
+    return (CheckoutJob.status == CheckoutJobStatus.PROCESSING) & (CheckoutJob.locked_at < stale_before)
+
+def fail_exhausted_jobs(db: Session) -> int:
+    """Give up on abandoned jobs that already used CHECKOUT_JOB_MAX_ATTEMPTS.
+
+    The job moves to FAILED and its order, if still pending, to CANCELLED with its stock
+    released. The status-guarded UPDATEs are the claims, so concurrent workers never
+    fail a job or restore its stock twice.
+    """
+    failed = db.execute(
+        update(CheckoutJob)
+        .where(_abandoned(), CheckoutJob.attempts >= settings.CHECKOUT_JOB_MAX_ATTEMPTS)
+        .values(status=CheckoutJobStatus.FAILED)
+        .returning(CheckoutJob.order_id, CheckoutJob.payment_reference)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not failed:
+        db.rollback()
+        return 0
+
+    cancelled_ids = [row[0] for row in db.execute(
+        update(Order)
+        .where(Order.id.in_([order_id for order_id, reference in failed]), Order.status == OrderStatus.PENDING)
+        .values(status=OrderStatus.CANCELLED)
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )]
+    restore_order_stock(db, cancelled_ids)
+    db.commit()
+
+    for order_id, reference in failed:
+        # A charge may have gone through before the job was abandoned: the reference finds it
+        logger.error(
+            f"Checkout job failed after {settings.CHECKOUT_JOB_MAX_ATTEMPTS} attempts - "
+            f"Order ID: {order_id}, payment reference: {reference}"
+        )
+    return len(failed)
+
+def claim_jobs(db: Session, limit: int) -> list[CheckoutJob]:
+    """Claim queued (or abandoned) checkout jobs for this worker.
+
+    Each job is taken with a conditional UPDATE that re-checks it is still claimable, so
+    two workers never both get it, also on SQLite, which ignores FOR UPDATE SKIP LOCKED.
+    Abandoned jobs are only retried while they have attempts left.
+    """
+    claimable = or_(
+        CheckoutJob.status == CheckoutJobStatus.QUEUED,
+        _abandoned() & (CheckoutJob.attempts < settings.CHECKOUT_JOB_MAX_ATTEMPTS)
+    )
+
+    candidate_ids = [row[0] for row in db.query(CheckoutJob.id).filter(claimable).order_by(
+        CheckoutJob.id
+    ).limit(limit).with_for_update(skip_locked=True).all()]
+
+    claimed_ids = []
+    now = datetime.now(timezone.utc)
+    for job_id in candidate_ids:
+        claimed = db.execute(
+            update(CheckoutJob)
+            .where(CheckoutJob.id == job_id, claimable)
+            .values(status=CheckoutJobStatus.PROCESSING, locked_at=now, attempts=CheckoutJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            claimed_ids.append(job_id)
+    db.commit()
+
+    if not claimed_ids:
+        return []
+    return db.query(CheckoutJob).filter(CheckoutJob.id.in_(claimed_ids)).order_by(CheckoutJob.id).all()
+
+def process_job(db: Session, job: CheckoutJob):
+    """Charge a pending order and move it to PAID, or CANCELLED with its stock released"""
+    order = db.query(Order).filter(Order.id == job.order_id).first()
+
+    if order is None or order.status != OrderStatus.PENDING:
+        # Cancelled (or already settled) while it was waiting in the queue
+        job.status = CheckoutJobStatus.DONE
+        db.commit()
+        return
+
+    if job.payment_reference is None:
+        # Committed before charging, so a retry of this job sends the same reference
+        # and the payment provider does not charge it again
+        job.payment_reference = uuid.uuid4().hex
+        db.commit()
+    payment_result = process_payment(order.total_amount, job.payment_reference)
+    new_status = OrderStatus.PAID if payment_result["success"] else OrderStatus.CANCELLED
+
+    # Only settle orders that are still pending, so a concurrent cancel wins cleanly
+    updated = db.query(Order).filter(
+        Order.id == order.id,
+        Order.status == OrderStatus.PENDING
+    ).update({Order.status: new_status}, synchronize_session=False)
+
+    if updated and new_status == OrderStatus.CANCELLED:
+        restore_order_stock(db, [order.id])
+
+    job.status = CheckoutJobStatus.DONE
+    db.commit()
+
+    if updated:
+        logger.info(f"Async checkout settled - Order ID: {order.id}, Status: {new_status.value}")
+
+def run_checkout_jobs() -> bool:
+    """Process one batch of checkout jobs; returns True when the batch was full"""
+    db = SessionLocal()
+    try:
+        fail_exhausted_jobs(db)
+        jobs = claim_jobs(db, settings.CHECKOUT_JOB_BATCH_SIZE)
+        for job in jobs:
+            try:
+                process_job(db, job)
+            except Exception:
+                db.rollback()
+                logger.exception(f"Checkout job failed - Order ID: {job.order_id}")
+        return len(jobs) == settings.CHECKOUT_JOB_BATCH_SIZE
+    finally:
+        db.close()
+
+def register_checkout_workers(count: int):
+    """Register the in-process checkout worker pool"""
+    for index in range(count):
+        register_task(f"checkout-worker-{index}", run_checkout_jobs, settings.CHECKOUT_WORKER_POLL_SECONDS)
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m app.checkout.worker
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    register_checkout_workers(max(settings.CHECKOUT_WORKERS, 1))
+    start_tasks()
+    stop_event.wait()
+    stop_tasks()
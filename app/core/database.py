@@ -1,17 +1,144 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, func, literal_column, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-    """Database dependency"""
+IS_SQLITE = engine.dialect.name == "sqlite"
+
+# Postgres SQLSTATE for "canceling statement due to statement timeout / user request"
+QUERY_CANCELED_PGCODE = "57014"
+
+class DeadlineExceeded(Exception):
+    """Raised when a request outlives its deadline or its client disconnects"""
+
+def _deadline_expired(state: dict) -> bool:
+    """Check whether a deadline state has run out or been cancelled"""
+    if not state or state.get("shielded"):
+        return False
+    return state["cancelled"] or time.monotonic() > state["deadline"]
+
+def is_deadline_error(exc: Exception) -> bool:
+    """Check whether a database error was caused by a request deadline"""
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    if isinstance(exc, OperationalError):
+        orig = exc.orig
+        if getattr(orig, "pgcode", None) == QUERY_CANCELED_PGCODE:
+            return True
+        return IS_SQLITE and "interrupted" in str(orig)
+    return False
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _install_progress_handler(dbapi_connection, connection_record):
+        """SQLite has no statement_timeout, so abort long statements from the VM progress handler"""
+        info = connection_record.info
+        dbapi_connection.set_progress_handler(lambda: 1 if _deadline_expired(info.get("deadline_state")) else 0, 1000)
+
+@event.listens_for(engine, "checkin")
+def _clear_deadline(dbapi_connection, connection_record):
+    """Pooled connections must not carry a previous request's deadline"""
+    state = connection_record.info.pop("deadline_state", None)
+    if state is not None:
+        state["dbapi_connection"] = None
+
+@event.listens_for(engine, "before_cursor_execute")
+def _check_deadline(conn, cursor, statement, parameters, context, executemany):
+    """Refuse to start new statements once the deadline has passed"""
+    if _deadline_expired(conn.info.get("deadline_state")):
+        raise DeadlineExceeded()
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_deadline(session, transaction, connection):
+    """Propagate the session deadline to the connection used by this transaction"""
+    state = session.info.get("deadline_state")
+    if state is None:
+        return
+    connection.info["deadline_state"] = state
+    state["dbapi_connection"] = connection.connection.dbapi_connection
+    if not IS_SQLITE and not state.get("shielded"):
+        remaining_ms = max(1, int((state["deadline"] - time.monotonic()) * 1000))
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {remaining_ms}")
+
+def try_job_lock(db, name: str) -> bool:
+    """Take a transaction-scoped advisory lock so that one worker at a time runs job `name`.
+
+    Released on commit or rollback. SQLite serializes writers itself, so it always succeeds there.
+    """
+    if IS_SQLITE:
+        return True
+    return db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": name}).scalar()
+
+def utc_date(column):
+    """Calendar day of a timestamp column in UTC, whatever the session time zone"""
+    if IS_SQLITE:
+        return func.date(column)  # SQLite timestamps are stored in UTC
+    # A literal, not a bound parameter, so the expression in SELECT and GROUP BY compiles alike
+    return func.date(func.timezone(literal_column("'UTC'"), column))
+
+def route_deadline_ms(request: Request) -> int:
+    """Get the configured deadline for the route handling this request"""
+    endpoint = request.scope.get("endpoint")
+    name = getattr(endpoint, "__name__", None)
+    return settings.ROUTE_DEADLINES_MS.get(name, settings.DEFAULT_REQUEST_DEADLINE_MS)
+
+async def _watch_disconnect(request: Request, state: dict):
+    """Cancel the request's database work once the client goes away"""
+    while not await request.is_disconnected():
+        await asyncio.sleep(settings.DISCONNECT_POLL_INTERVAL_SECONDS)
+    logger.warning(f"Client disconnected, cancelling database work for {request.url.path}")
+    state["cancelled"] = True
+    # Route handlers run in the threadpool, so this interrupts the statement in flight
+    dbapi_connection = state.get("dbapi_connection")
+    if dbapi_connection is not None and not state.get("shielded"):
+        if IS_SQLITE:
+            dbapi_connection.interrupt()
+        else:
+            dbapi_connection.cancel()
+
+def shield_from_deadline(db):
+    """Stop enforcing the session's deadline and disconnect cancel for the rest of the request.
+
+    For work that must finish once started, such as writing an order after its payment.
+    Raises DeadlineExceeded if the deadline has already passed, so nothing irreversible starts.
+    """
+    state = db.info.get("deadline_state")
+    if state is None or state.get("shielded"):
+        return
+    if _deadline_expired(state):
+        raise DeadlineExceeded()
+    state["shielded"] = True
+    if not IS_SQLITE and state.get("dbapi_connection") is not None and db.in_transaction():
+        db.execute(text("SET LOCAL statement_timeout = 0"))
+
+def open_session(deadline_ms: int = 0):
+    """Create a session whose statements must finish within `deadline_ms` (0 for no deadline)"""
     db = SessionLocal()
+    if deadline_ms > 0:
+        db.info["deadline_state"] = {"deadline": time.monotonic() + deadline_ms / 1000, "cancelled": False}
+    return db
+
+async def get_db(request: Request):
+    """Database dependency"""
+    db = open_session(route_deadline_ms(request))
+    watcher = None
+    if "deadline_state" in db.info:
+        watcher = asyncio.create_task(_watch_disconnect(request, db.info["deadline_state"]))
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        if watcher is not None:
+            watcher.cancel()
+        db.close()
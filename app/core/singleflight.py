@@ -0,0 +1,47 @@
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so they share one execution and its result.
+
+    The first caller for a key runs `func` in the threadpool; callers arriving while it
+    is in flight await the same task instead of issuing their own query. Results are
+    not cached beyond the flight, so they are never staler than an uncoalesced read.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight = {}
+        _flights.append(self)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved when every waiter went away
+
+    async def do(self, key, func, *args):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(run_in_threadpool(func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # Shield so a disconnecting caller does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+_flights: list[SingleFlight] = []
+
+def flight_stats() -> list:
+    """Get the counters of every coalescing layer in this process"""
+    return [flight.stats() for flight in _flights]
@@ -0,0 +1,71 @@
+from app.core.config import settings
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask(threading.Thread):
+    """Daemon thread that runs a job function every `interval` seconds until stopped.
+
+    If the job returns a truthy value (e.g. it filled a whole batch) it is run again
+    immediately so backlogs drain without waiting for the next tick.
+    """
+
+    def __init__(self, name: str, func, interval: float):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        logger.info(f"Background task started: {self.name}")
+        while not self._stop_event.is_set():
+            try:
+                busy = self.func()
+            except Exception:
+                logger.exception(f"Background task failed: {self.name}")
+                busy = False
+            if not busy:
+                self._stop_event.wait(self.interval)
+        logger.info(f"Background task stopped: {self.name}")
+
+    def stop(self):
+        self._stop_event.set()
+
+_tasks: list[PeriodicTask] = []
+
+# Set by the app.serve supervisor in each forked worker
+WORKER_INDEX_ENV = "APP_WORKER_INDEX"
+
+def runs_shared_jobs() -> bool:
+    """Whether this process runs the jobs that work on the whole database (sweeps, rollups, purges).
+
+    With several app.serve workers only SERVER_JOBS_WORKER runs them (-1: every worker); a
+    process not started by the supervisor always does.
+    """
+    index = os.getenv(WORKER_INDEX_ENV)
+    if index is None or settings.SERVER_JOBS_WORKER < 0:
+        return True
+    return int(index) == settings.SERVER_JOBS_WORKER
+
+def register_task(name: str, func, interval: float) -> PeriodicTask:
+    """Register a background task to be started with the application"""
+    task = PeriodicTask(name, func, interval)
+    _tasks.append(task)
+    return task
+
+def start_tasks():
+    """Start all registered background tasks"""
+    for task in _tasks:
+        if not task.is_alive():
+            task.start()
+
+def stop_tasks(timeout: float = 10.0):
+    """Signal all background tasks to stop and wait for the current run to finish"""
+    for task in _tasks:
+        task.stop()
+    for task in _tasks:
+        if task.is_alive():
+            task.join(timeout)
+    _tasks.clear()
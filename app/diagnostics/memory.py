@@ -0,0 +1,63 @@
+import threading
+import tracemalloc
+
+_memory_lock = threading.Lock()
+_baseline = None
+
+_FILTERS = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+def start_tracing(frames: int):
+    """Start tracing allocations (only from here on do they cost anything) and take the baseline"""
+    global _baseline
+    with _memory_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        _baseline = _snapshot()
+
+def stop_tracing():
+    global _baseline
+    with _memory_lock:
+        _baseline = None
+        tracemalloc.stop()
+
+def _stat(stat, group_by: str, diff: bool = False) -> dict:
+    frame = stat.traceback[-1]  # the allocation site
+    result = {"file": frame.filename, "line": frame.lineno, "size_kib": round(stat.size / 1024, 1), "count": stat.count}
+    if group_by == "traceback":
+        # Oldest call first, ending at the allocation site
+        result["traceback"] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    if diff:
+        result["size_diff_kib"] = round(stat.size_diff / 1024, 1)
+        result["count_diff"] = stat.count_diff
+    return result
+
+def top_allocations(group_by: str, limit: int) -> dict:
+    """Biggest live allocations right now, grouped by `lineno`, `filename` or `traceback`"""
+    snapshot = _snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_kib": round(current / 1024, 1),
+        "peak_kib": round(peak / 1024, 1),
+        "allocations": [_stat(stat, group_by) for stat in snapshot.statistics(group_by)[:limit]],
+    }
+
+def allocation_diff(group_by: str, limit: int, reset_baseline: bool) -> dict:
+    """Allocation growth since the baseline snapshot"""
+    global _baseline
+    snapshot = _snapshot()
+    with _memory_lock:
+        baseline = _baseline
+        if reset_baseline:
+            _baseline = snapshot
+    return {"allocations": [_stat(stat, group_by, diff=True) for stat in snapshot.compare_to(baseline, group_by)[:limit]]}
@@ -0,0 +1,54 @@
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+_profile_lock = threading.Lock()
+
+class ProfilerBusy(Exception):
+    pass
+
+def _collapse(frame) -> str:
+    """Render a frame's stack root-first as `module:function:line` entries joined by ';'"""
+    entries = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        entries.append(f"{module}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(entries))
+
+def sample_stacks(seconds: float, interval: float) -> tuple:
+    """Sample the stacks of every thread of this process for `seconds`.
+
+    Nothing runs between profiles: the sampler only exists for the duration of a call,
+    and one profile at a time is allowed per worker. Returns (collapsed stack counts,
+    number of samples).
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                if thread_id not in names:
+                    # A thread started during the profile (e.g. a new threadpool worker)
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                thread_name = names.get(thread_id, f"thread-{thread_id}")
+                stacks[f"{thread_name};{_collapse(frame)}"] += 1
+            samples += 1
+            time.sleep(interval)
+        return stacks, samples
+    finally:
+        _profile_lock.release()
+
+def collapsed_output(stacks: Counter) -> str:
+    """Collapsed-stack text (one `stack count` line per stack), as read by flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.diagnostics.profiler import ProfilerBusy, sample_stacks, collapsed_output
+from app.diagnostics import memory
+from app.middlewares.auth_middleware import get_admin_user
+from app.core.config import settings
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def require_diagnostics():
+    if not settings.DIAGNOSTICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Diagnostics are disabled", "code": 404}
+        )
+
+router = APIRouter(dependencies=[Depends(require_diagnostics)])
+
+GROUP_BY_PATTERN = "^(lineno|filename|traceback)$"
+
+def require_tracing():
+    if not memory.is_tracing():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": True, "message": "Memory tracing is not running", "code": 409}
+        )
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_cpu(seconds: float = Query(5, gt=0),interval_ms: float = Query(5, ge=1, le=1000),
+                      admin_user = Depends(get_admin_user)):
+    """Sample this worker's stacks for a while and return them in collapsed-stack format (Admin only)"""
+    if seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"Profiles are limited to {settings.PROFILE_MAX_SECONDS:g} seconds", "code": 400}
+        )
+    
+    logger.info(f"Admin {admin_user.email} profiling worker {os.getpid()} for {seconds}s")
+    
+    try:
+        # Sample from a threadpool thread so the event loop keeps serving (and shows up in the profile)
+        stacks, samples = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": True, "message": "A profile is already running on this worker", "code": 409}
+        )
+    
+    return PlainTextResponse(
+        collapsed_output(stacks),
+        headers={"X-Worker-Pid": str(os.getpid()), "X-Profile-Samples": str(samples)}
+    )
+
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(10, ge=1, le=100),admin_user = Depends(get_admin_user)):
+    """Start tracemalloc on this worker and take the baseline snapshot (Admin only)"""
+    logger.info(f"Admin {admin_user.email} starting memory tracing on worker {os.getpid()}")
+    
+    await run_in_threadpool(memory.start_tracing, frames)
+    return {"message": "Memory tracing started", "pid": os.getpid()}
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(admin_user = Depends(get_admin_user)):
+    """Stop tracemalloc on this worker (Admin only)"""
+    require_tracing()
+    
+    memory.stop_tracing()
+    return {"message": "Memory tracing stopped", "pid": os.getpid()}
+
+@router.get("/memory/top")
+async def get_memory_top(group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),limit: int = Query(20, ge=1, le=200),
+                         admin_user = Depends(get_admin_user)):
+    """Get the biggest live allocations of this worker (Admin only)"""
+    require_tracing()
+    
+    result = await run_in_threadpool(memory.top_allocations, group_by, limit)
+    return {"pid": os.getpid(), **result}
+
+@router.get("/memory/diff")
+async def get_memory_diff(group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),limit: int = Query(20, ge=1, le=200),
+                          reset_baseline: bool = Query(False),admin_user = Depends(get_admin_user)):
+    """Get allocation growth since the baseline snapshot (Admin only)"""
+    require_tracing()
+    
+    result = await run_in_threadpool(memory.allocation_diff, group_by, limit, reset_baseline)
+    return {"pid": os.getpid(), **result}
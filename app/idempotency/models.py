@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class IdempotencyStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key of one user on one endpoint, and the response it produced.
+
+    The row is claimed (IN_PROGRESS) before the request runs and holds the response once it
+    finishes, so a retry with the same key replays the response instead of running again.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("user_id", "endpoint", "key", name="uq_idempotency_keys_user_endpoint_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    endpoint = Column(String(50), nullable=False)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of the request parameters: reusing a key for a different request is rejected
+    request_hash = Column(String(64), nullable=False)
+    status = Column(Enum(IdempotencyStatus), nullable=False, default=IdempotencyStatus.IN_PROGRESS)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
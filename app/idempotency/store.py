@@ -0,0 +1,226 @@
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.idempotency.models import IdempotencyKey, IdempotencyStatus
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# Stored for a request that failed after its point of no return (see mark_irreversible)
+FAILED_AFTER_IRREVERSIBLE = {"error": True, "message": "Request failed after it could no longer be retried", "code": 500}
+
+# State of the request run by run_idempotent in this context: {"irreversible": bool}
+_current_run = contextvars.ContextVar("idempotent_run", default=None)
+
+def request_hash(params) -> str:
+    """Fingerprint of the request parameters a key was first used with"""
+    return hashlib.sha256(json.dumps(jsonable_encoder(params), sort_keys=True).encode()).hexdigest()
+
+def _aware(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class ResponseCache:
+    """Per-worker front of completed keys, so a retry reaching the same worker skips the database"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, scope: tuple) -> Optional[tuple]:
+        entry = self._entries.get(scope)
+        if entry is None:
+            return None
+        expires_at, digest, status_code, body = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._entries.pop(scope, None)
+            return None
+        return digest, status_code, body
+
+    def put(self, scope: tuple, digest: str, status_code: int, body):
+        with self._lock:
+            if len(self._entries) >= settings.IDEMPOTENCY_CACHE_SIZE:
+                self._entries.clear()
+            self._entries[scope] = (time.monotonic() + settings.IDEMPOTENCY_CACHE_TTL_SECONDS, digest, status_code, body)
+
+response_cache = ResponseCache()
+
+def _key_filter(scope: tuple):
+    user_id, endpoint, key = scope
+    return (IdempotencyKey.user_id == user_id, IdempotencyKey.endpoint == endpoint, IdempotencyKey.key == key)
+
+def _conflict(message: str, code: int):
+    return HTTPException(status_code=code, detail={"error": True, "message": message, "code": code})
+
+def _key_mismatch():
+    # 422 as a number: the constant's name differs between Starlette versions
+    return _conflict("Idempotency-Key was used with different request parameters", 422)
+
+def claim_key(scope: tuple, digest: str) -> Optional[tuple]:
+    """Claim a key for a new request, or get the stored (status, body) of the request that used it.
+
+    Returns None when the caller now owns the key and must run the request. Raises 422 when
+    the key was used with different parameters and 409 while another request holds it. A claim
+    older than IDEMPOTENCY_LOCK_TIMEOUT_SECONDS (its request died) can be taken over.
+    """
+    cached = response_cache.get(scope)
+    if cached is not None:
+        cached_digest, status_code, body = cached
+        if cached_digest != digest:
+            raise _key_mismatch()
+        return status_code, body
+
+    user_id, endpoint, key = scope
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        for attempt in range(2):
+            db.add(IdempotencyKey(
+                user_id=user_id,
+                endpoint=endpoint,
+                key=key,
+                request_hash=digest,
+                status=IdempotencyStatus.IN_PROGRESS,
+                locked_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+            ))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            record = db.query(IdempotencyKey).filter(*_key_filter(scope)).first()
+            if record is None:
+                continue  # released in the meantime
+            if _aware(record.expires_at) <= now:
+                db.delete(record)
+                db.commit()
+                continue
+            if record.request_hash != digest:
+                raise _key_mismatch()
+            if record.status == IdempotencyStatus.COMPLETED:
+                body = json.loads(record.response_body)
+                response_cache.put(scope, digest, record.response_status, body)
+                return record.response_status, body
+
+            # Still in progress: only take over a claim whose request is long gone
+            stale_before = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+            taken = db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.id == record.id, IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS, IdempotencyKey.locked_at < stale_before)
+                .values(locked_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if taken:
+                logger.warning(f"Took over stale idempotency key {key} of user {user_id} on {endpoint}")
+                return None
+            break
+    finally:
+        db.close()
+    raise _conflict("A request with this Idempotency-Key is still in progress", status.HTTP_409_CONFLICT)
+
+def complete_key(scope: tuple, digest: str, status_code: int, body):
+    """Store the response of a claimed key for replay.
+
+    Failures are only logged: the request itself is done, and its key stays claimed until
+    the lock timeout, after which a retry runs again against the changed state.
+    """
+    response_cache.put(scope, digest, status_code, body)
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(IdempotencyKey)
+            .where(*_key_filter(scope))
+            .values(status=IdempotencyStatus.COMPLETED, response_status=status_code, response_body=json.dumps(body))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        logger.exception(f"Could not store the response of idempotency key {scope[2]} on {scope[1]}")
+    finally:
+        db.close()
+
+def release_key(scope: tuple):
+    """Drop an in-progress claim so that a retry runs the request again"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            delete(IdempotencyKey)
+            .where(*_key_filter(scope), IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def mark_irreversible():
+    """Record that the running request is about to do what a retry must not repeat (charge a card).
+
+    From then on a failure is stored and replayed like any response instead of releasing the
+    key. Does nothing outside run_idempotent.
+    """
+    run = _current_run.get()
+    if run is not None:
+        run["irreversible"] = True
+
+def run_idempotent(endpoint: str, user_id: int, key: Optional[str], params, response: Response, func: Callable, default_status: int = status.HTTP_200_OK):
+    """Run `func()` at most once per Idempotency-Key and replay its response to retries.
+
+    Without a key the request simply runs. Successful responses and client errors are stored;
+    server errors and exceptions release the key so the client can retry it, unless they happen
+    after mark_irreversible(), in which case the failure is stored too. Replays carry an
+    `Idempotent-Replayed: true` header.
+    """
+    if key is None:
+        return func()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters", "code": 400}
+        )
+
+    scope = (user_id, endpoint, key)
+    digest = request_hash(params)
+    replay = claim_key(scope, digest)
+    if replay is not None:
+        status_code, body = replay
+        return JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+
+    run = {"irreversible": False}
+    token = _current_run.set(run)
+    try:
+        result = func()
+    except HTTPException as e:
+        if e.status_code >= 500 and not run["irreversible"]:
+            release_key(scope)
+        else:
+            complete_key(scope, digest, e.status_code, {"detail": e.detail})
+        raise
+    except BaseException:
+        if run["irreversible"]:
+            complete_key(scope, digest, status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": FAILED_AFTER_IRREVERSIBLE})
+        else:
+            release_key(scope)
+        raise
+    finally:
+        _current_run.reset(token)
+
+    complete_key(scope, digest, response.status_code or default_status, jsonable_encoder(result))
+    return result
@@ -1,12 +1,34 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+from contextlib import asynccontextmanager
+import importlib
 import logging
 import time
-from app.auth.routes import router as auth_router
-from app.products.routes import router as products_router
-from app.cart.routes import router as cart_router
-from app.checkout.routes import router as checkout_router
-from app.orders.routes import router as orders_router
 from app.core.config import settings
+from app.core.database import DeadlineExceeded, is_deadline_error
+from app.core.tasks import runs_shared_jobs, start_tasks, stop_tasks
+
+# Router groups, mounted per deployment role with APP_ROUTERS: (module, router attribute, prefix, tag)
+ROUTER_GROUPS = {
+    "auth": [("app.auth.routes", "router", "/auth", "Authentication")],
+    "catalog": [
+        ("app.products.routes", "router", "", "Products"),
+        ("app.categories.routes", "router", "", "Categories"),
+    ],
+    "cart": [("app.cart.routes", "router", "/cart", "Cart")],
+    "checkout": [("app.checkout.routes", "router", "/checkout", "Checkout")],
+    "orders": [
+        ("app.orders.routes", "router", "/orders", "Orders"),
+        ("app.orders.routes", "admin_router", "/admin/orders", "Orders"),
+    ],
+    "admin": [
+        ("app.analytics.routes", "router", "/admin/analytics", "Analytics"),
+        ("app.maintenance.routes", "router", "/admin/maintenance", "Maintenance"),
+        ("app.diagnostics.routes", "router", "/admin/diagnostics", "Diagnostics"),
+        ("app.promotions.routes", "router", "/admin/promotions", "Promotions"),
+    ],
+}
 
 # Configure logging
 logging.basicConfig(
@@ -20,10 +42,57 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background workers with the application"""
+    # Job modules are imported only when their job is enabled
+    if settings.CHECKOUT_MODE == "async":
+        from app.checkout.worker import register_checkout_workers
+        register_checkout_workers(settings.CHECKOUT_WORKERS)
+    # In-memory caches of this worker
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        from app.products.snapshot import register_catalog_snapshot
+        register_catalog_snapshot()
+    if settings.STOCK_STREAM_ENABLED:
+        from app.products.stream import register_change_listener
+        register_change_listener()
+    if settings.PROMOTIONS_ENABLED:
+        from app.promotions.engine import register_promotions
+        register_promotions()
+    if settings.SUGGEST_INDEX_ENABLED:
+        from app.products.suggest import register_suggest_index
+        register_suggest_index()
+    # Jobs over the whole database run in one worker only
+    if runs_shared_jobs():
+        if settings.CART_RESERVATIONS_ENABLED:
+            from app.cart.reservations import register_reservation_sweeper
+            register_reservation_sweeper()
+        from app.products.inventory import register_hot_stock_sync
+        register_hot_stock_sync()
+        if settings.RELATED_PRODUCTS_ENABLED:
+            from app.products.related import register_related_products
+            register_related_products()
+        if settings.POPULARITY_ROLLUP_ENABLED:
+            from app.products.popularity import register_popularity_rollup
+            register_popularity_rollup()
+        if settings.ANALYTICS_ROLLUP_ENABLED:
+            from app.analytics.rollup import register_analytics_rollup
+            register_analytics_rollup()
+        if settings.RETENTION_ENABLED:
+            from app.maintenance.retention import register_retention_jobs
+            register_retention_jobs()
+        if settings.ORDER_ARCHIVE_ENABLED:
+            from app.orders.archive import register_order_archiver
+            register_order_archiver()
+    start_tasks()
+    yield
+    stop_tasks()
+
 app = FastAPI(
     title="E-commerce Backend",
     description="A robust e-commerce backend system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 ) 
 
 # Middleware for logging requests
@@ -46,12 +115,32 @@ async def log_requests(request: Request, call_next):
     
     return response
 
-# Include routers
-app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
-app.include_router(products_router, prefix="", tags=["Products"])
-app.include_router(cart_router, prefix="/cart", tags=["Cart"])
-app.include_router(checkout_router, prefix="/checkout", tags=["Checkout"])
-app.include_router(orders_router, prefix="/orders", tags=["Orders"])
+# Deadline handling
+@app.exception_handler(DeadlineExceeded)
+@app.exception_handler(OperationalError)
+async def deadline_exception_handler(request: Request, exc: Exception):
+    if is_deadline_error(exc):
+        logger.warning(f"Deadline exceeded: {request.method} {request.url.path}")
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"detail": {"error": True, "message": "Request deadline exceeded", "code": 504}}
+        )
+    logger.error(f"Database error: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": {"error": True, "message": "Database error", "code": 500}}
+    )
+
+# Include routers (only the modules of the selected groups are imported)
+unknown_groups = set(settings.APP_ROUTERS) - set(ROUTER_GROUPS) - {"all"}
+if unknown_groups:
+    logger.warning(f"Unknown router groups in APP_ROUTERS: {', '.join(sorted(unknown_groups))}")
+for group, routers in ROUTER_GROUPS.items():
+    if "all" not in settings.APP_ROUTERS and group not in settings.APP_ROUTERS:
+        continue
+    for module_name, attribute, prefix, tag in routers:
+        router = getattr(importlib.import_module(module_name), attribute)
+        app.include_router(router, prefix=prefix, tags=[tag])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, BigInteger, String, DateTime
+from app.core.database import Base
+
+class RetentionStat(Base):
+    """Rows the retention job has reclaimed from one table, summed over every worker and run"""
+    __tablename__ = "retention_stats"
+    
+    table_name = Column(String(50), primary_key=True)
+    reclaimed = Column(BigInteger, nullable=False, default=0)
+    last_run_at = Column(DateTime(timezone=True))
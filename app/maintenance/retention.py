@@ -0,0 +1,114 @@
+from sqlalchemy import delete, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, IS_SQLITE
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.auth.models import PasswordResetToken
+from app.cart.models import Cart
+from app.idempotency.models import IdempotencyKey
+from app.maintenance.models import RetentionStat
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETENTION_TABLES = ("password_reset_tokens", "cart", "idempotency_keys")
+
+def record_retention(db: Session, reclaimed: dict):
+    """Add one run's reclaimed rows per table to the stats shared by every worker"""
+    now = datetime.now(timezone.utc)
+    upsert = (sqlite.insert if IS_SQLITE else postgresql.insert)(RetentionStat).values([
+        {"table_name": table, "reclaimed": count, "last_run_at": now} for table, count in reclaimed.items()
+    ])
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=[RetentionStat.table_name],
+        set_={"reclaimed": RetentionStat.reclaimed + upsert.excluded.reclaimed, "last_run_at": upsert.excluded.last_run_at}
+    ))
+    db.commit()
+
+def purge_reset_tokens(db: Session, batch_size: int) -> int:
+    """Delete one batch of used or expired password-reset tokens"""
+    now = datetime.now(timezone.utc)
+    stale = or_(PasswordResetToken.used == True, PasswordResetToken.expiration_time < now)
+    token_ids = [row[0] for row in db.query(PasswordResetToken.id).filter(stale).limit(batch_size).all()]
+    if not token_ids:
+        return 0
+
+    deleted = db.execute(
+        delete(PasswordResetToken)
+        .where(PasswordResetToken.id.in_(token_ids), stale)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+def purge_idle_carts(db: Session, batch_size: int) -> int:
+    """Delete the carts of one batch of users whose cart has not changed for CART_IDLE_DAYS"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.CART_IDLE_DAYS)
+    active_users = db.query(Cart.user_id).filter(Cart.updated_at >= cutoff)
+    user_ids = [row[0] for row in db.query(Cart.user_id).filter(
+        Cart.updated_at < cutoff,
+        Cart.user_id.not_in(active_users)
+    ).distinct().limit(batch_size).all()]
+    if not user_ids:
+        return 0
+
+    # Re-check idleness so a cart touched since the scan is kept
+    deleted = db.execute(
+        delete(Cart)
+        .where(Cart.user_id.in_(user_ids), Cart.user_id.not_in(active_users))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+def purge_idempotency_keys(db: Session, batch_size: int) -> int:
+    """Delete one batch of expired idempotency keys"""
+    now = datetime.now(timezone.utc)
+    key_ids = [row[0] for row in db.query(IdempotencyKey.id).filter(IdempotencyKey.expires_at < now).limit(batch_size).all()]
+    if not key_ids:
+        return 0
+
+    deleted = db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.id.in_(key_ids), IdempotencyKey.expires_at < now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+def run_retention() -> bool:
+    """Run one batch of every purge; returns True while any of them still has a full batch"""
+    batch_size = settings.RETENTION_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        tokens = purge_reset_tokens(db, batch_size)
+        carts = purge_idle_carts(db, batch_size)
+        keys = purge_idempotency_keys(db, batch_size)
+        record_retention(db, {"password_reset_tokens": tokens, "cart": carts, "idempotency_keys": keys})
+    finally:
+        db.close()
+
+    if tokens or carts or keys:
+        logger.info(f"Retention reclaimed {tokens} reset tokens, {carts} cart rows and {keys} idempotency keys")
+    return tokens == batch_size or carts >= batch_size or keys == batch_size
+
+def get_retention_stats(db: Session) -> dict:
+    stats = {row.table_name: row for row in db.query(RetentionStat).all()}
+    return {
+        table: {
+            "reclaimed": stats[table].reclaimed if table in stats else 0,
+            "last_run_at": stats[table].last_run_at if table in stats else None
+        }
+        for table in RETENTION_TABLES
+    }
+
+def register_retention_jobs():
+    """Register the periodic retention task"""
+    register_task("retention", run_retention, settings.RETENTION_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    # Drain everything once: python -m app.maintenance.retention
+    while run_retention():
+        pass
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.maintenance.retention import get_retention_stats
+from app.middlewares.auth_middleware import get_admin_user
+
+router = APIRouter()
+
+@router.get("/retention")
+def get_retention(db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get rows reclaimed by the retention job across all workers (Admin only)"""
+    
+    return get_retention_stats(db)
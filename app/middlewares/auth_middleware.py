@@ -9,7 +9,7 @@ import logging
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security),db: Session = Depends(get_db)) -> User:
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security),db: Session = Depends(get_db)) -> User:
     """Get current authenticated user"""
     token = credentials.credentials
     payload = verify_token(token)
@@ -0,0 +1,77 @@
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, IS_SQLITE
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.checkout.models import CheckoutJob
+from app.orders.models import Order, OrderItem, OrderStatus, OrderArchive, OrderItemArchive
+from datetime import date, datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def ensure_partitions(db: Session, months: set):
+    """Create the monthly archive partitions (Postgres) that rows of `months` will land in"""
+    if IS_SQLITE:
+        return
+    for month in sorted(months):
+        for table in ("orders_archive", "order_items_archive"):
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+
+def archive_orders(db: Session, batch_size: int) -> int:
+    """Move one batch of finished orders older than ORDER_ARCHIVE_AFTER_DAYS to the archive tables"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+    orders = db.query(Order.id, Order.created_at).filter(
+        Order.created_at < cutoff,
+        Order.status != OrderStatus.PENDING
+    ).order_by(Order.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not orders:
+        return 0
+
+    order_ids = [order_id for order_id, created_at in orders]
+    ensure_partitions(db, {_month_start(created_at) for order_id, created_at in orders})
+
+    db.execute(insert(OrderArchive).from_select(
+        ["id", "created_at", "user_id", "total_amount", "status"],
+        select(Order.id, Order.created_at, Order.user_id, Order.total_amount, Order.status).where(Order.id.in_(order_ids))
+    ))
+    db.execute(insert(OrderItemArchive).from_select(
+        ["id", "order_created_at", "order_id", "product_id", "quantity", "price_at_purchase"],
+        select(
+            OrderItem.id, Order.created_at, OrderItem.order_id, OrderItem.product_id,
+            OrderItem.quantity, OrderItem.price_at_purchase
+        ).join(Order, Order.id == OrderItem.order_id).where(OrderItem.order_id.in_(order_ids))
+    ))
+    db.execute(delete(CheckoutJob).where(CheckoutJob.order_id.in_(order_ids)))
+    db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+    db.execute(delete(Order).where(Order.id.in_(order_ids)))
+    db.commit()
+
+    logger.info(f"Archived {len(order_ids)} orders")
+    return len(order_ids)
+
+def run_order_archiver() -> bool:
+    """Archive one batch; returns True when the batch was full"""
+    db = SessionLocal()
+    try:
+        return archive_orders(db, settings.ORDER_ARCHIVE_BATCH_SIZE) == settings.ORDER_ARCHIVE_BATCH_SIZE
+    finally:
+        db.close()
+
+def register_order_archiver():
+    """Register the periodic order archival task"""
+    register_task("order-archiver", run_order_archiver, settings.ORDER_ARCHIVE_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    # Archive everything that is due: python -m app.orders.archive
+    while run_order_archiver():
+        pass
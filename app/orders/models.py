@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Index, false
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -10,12 +10,15 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_status_related_counted", "status", "related_counted"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
     total_amount = Column(Float, nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Whether the order's pairs are in the related products counts (see app.products.related)
+    related_counted = Column(Boolean, nullable=False, default=False, server_default=false())
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -24,4 +27,28 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     product_id = Column(Integer, nullable=False)
     quantity = Column(Integer, nullable=False)
-    price_at_purchase = Column(Float, nullable=False)
\ No newline at end of file
+    price_at_purchase = Column(Float, nullable=False)
+
+# Cold storage for orders moved out by app.orders.archive. On Postgres both tables are
+# range-partitioned by month of the order date, so the partition key is part of the key.
+
+class OrderArchive(Base):
+    __tablename__ = "orders_archive"
+    __table_args__ = (Index("ix_orders_archive_user_id_created_at", "user_id", "created_at"),)
+    
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    total_amount = Column(Float, nullable=False)
+    status = Column(Enum(OrderStatus))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class OrderItemArchive(Base):
+    __tablename__ = "order_items_archive"
+    
+    id = Column(Integer, primary_key=True)
+    order_created_at = Column(DateTime(timezone=True), primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    price_at_purchase = Column(Float, nullable=False)
@@ -1,24 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.orders.models import Order, OrderItem
-from app.orders.schemas import OrderResponse, OrderDetailResponse, OrderHistoryResponse, OrderItemResponse
+from app.orders.models import Order, OrderItem, OrderArchive, OrderItemArchive
+from app.orders.schemas import OrderResponse, OrderDetailResponse, OrderHistoryResponse, OrderItemResponse, OrderBulkCancel, OrderBulkCancelResponse
+from app.orders.utils import cancel_orders
 from app.products.models import Product
-from app.middlewares.auth_middleware import get_current_user
+from app.middlewares.auth_middleware import get_current_user, get_admin_user
 from app.auth.models import User
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+admin_router = APIRouter()
 
 @router.get("", response_model=OrderHistoryResponse)
-async def get_order_history(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+def get_order_history(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
     """Get user's order history"""
     logger.info(f"User {current_user.email} fetching order history")
     
     orders = db.query(Order).filter(
         Order.user_id == current_user.id
     ).order_by(Order.created_at.desc()).all()
+    
+    # Archived orders are all older than the live ones
+    orders += db.query(OrderArchive).filter(
+        OrderArchive.user_id == current_user.id
+    ).order_by(OrderArchive.created_at.desc()).all()
 
     if not orders:
         return HTTPException(
@@ -32,7 +39,7 @@ async def get_order_history(db: Session = Depends(get_db),current_user: User = D
     )
 
 @router.get("/{order_id}", response_model=OrderDetailResponse)
-async def get_order_details(order_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+def get_order_details(order_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
     """Get order details"""
     logger.info(f"User {current_user.email} fetching order details: {order_id}")
     
@@ -41,6 +48,15 @@ async def get_order_details(order_id: int,db: Session = Depends(get_db),current_
         Order.id == order_id,
         Order.user_id == current_user.id
     ).first()
+    item_model = OrderItem
+    
+    if not order:
+        # Fall back to the archive for old orders
+        order = db.query(OrderArchive).filter(
+            OrderArchive.id == order_id,
+            OrderArchive.user_id == current_user.id
+        ).first()
+        item_model = OrderItemArchive
     
     if not order:
         raise HTTPException(
@@ -49,9 +65,9 @@ async def get_order_details(order_id: int,db: Session = Depends(get_db),current_
         )
     
     # Get order items with product details
-    order_items = db.query(OrderItem, Product).join(
-        Product, OrderItem.product_id == Product.id,isouter= True,
-    ).filter(OrderItem.order_id == order_id).all()
+    order_items = db.query(item_model, Product).join(
+        Product, item_model.product_id == Product.id,isouter= True,
+    ).filter(item_model.order_id == order_id).all()
     
     items = []
     for order_item, product in order_items:
@@ -73,4 +89,67 @@ async def get_order_details(order_id: int,db: Session = Depends(get_db),current_
         status=order.status,
         created_at=order.created_at,
         items=items
-    )
\ No newline at end of file
+    )
+
+def cancel_single_order(db: Session, order_id: int, user_id: int = None) -> dict:
+    """Cancel one order, distinguishing missing orders from ones that can no longer be cancelled"""
+    query = db.query(Order).filter(Order.id == order_id)
+    if user_id is not None:
+        query = query.filter(Order.user_id == user_id)
+    
+    order = query.first()
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Order not found", "code": 404}
+        )
+    
+    cancelled_ids = cancel_orders(db, [order_id], user_id=user_id)
+    if not cancelled_ids:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "Order cannot be cancelled", "code": 400}
+        )
+    
+    db.commit()
+    return {"message": "Order cancelled successfully", "order_id": order_id}
+
+@router.post("/{order_id}/cancel")
+def cancel_order(order_id: int,db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    """Cancel an order and restore its stock"""
+    logger.info(f"User {current_user.email} cancelling order: {order_id}")
+    
+    result = cancel_single_order(db, order_id, user_id=current_user.id)
+    
+    logger.info(f"Order cancelled successfully: {order_id}")
+    return result
+
+# Admin Order Routes
+@admin_router.post("/{order_id}/cancel")
+def admin_cancel_order(order_id: int,db: Session = Depends(get_db),admin_user: User = Depends(get_admin_user)):
+    """Cancel any user's order and restore its stock (Admin only)"""
+    logger.info(f"Admin {admin_user.email} cancelling order: {order_id}")
+    
+    result = cancel_single_order(db, order_id)
+    
+    logger.info(f"Order cancelled successfully: {order_id}")
+    return result
+
+@admin_router.post("/cancel", response_model=OrderBulkCancelResponse)
+def admin_bulk_cancel_orders(cancel_data: OrderBulkCancel,db: Session = Depends(get_db),admin_user: User = Depends(get_admin_user)):
+    """Cancel many orders in one transaction (Admin only)"""
+    order_ids = list(dict.fromkeys(cancel_data.order_ids))
+    logger.info(f"Admin {admin_user.email} bulk cancelling {len(order_ids)} orders")
+    
+    cancelled_ids = cancel_orders(db, order_ids)
+    db.commit()
+    
+    cancelled = set(cancelled_ids)
+    skipped = [order_id for order_id in order_ids if order_id not in cancelled]
+    
+    logger.info(f"Bulk cancel finished - cancelled: {len(cancelled_ids)}, skipped: {len(skipped)}")
+    return OrderBulkCancelResponse(
+        cancelled=sorted(cancelled_ids),
+        skipped=skipped
+    )
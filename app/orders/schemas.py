@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.orders.models import OrderStatus
 from datetime import datetime
 from typing import List
@@ -35,4 +35,11 @@ class OrderDetailResponse(BaseModel):
 
 class OrderHistoryResponse(BaseModel):
     orders: List[OrderResponse]
-    total: int
\ No newline at end of file
+    total: int
+
+class OrderBulkCancel(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class OrderBulkCancelResponse(BaseModel):
+    cancelled: List[int]
+    skipped: List[int]
@@ -0,0 +1,42 @@
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.utils import apply_stock_deltas
+from typing import Optional
+
+CANCELLABLE_STATUSES = (OrderStatus.PENDING, OrderStatus.PAID)
+
+def restore_order_stock(db: Session, order_ids: list) -> int:
+    """Return the stock held by the given orders to their products in one set-based UPDATE"""
+    if not order_ids:
+        return 0
+    
+    quantities = db.query(OrderItem.product_id, func.sum(OrderItem.quantity)).filter(
+        OrderItem.order_id.in_(order_ids)
+    ).group_by(OrderItem.product_id).all()
+    
+    return len(apply_stock_deltas(db, {product_id: int(quantity) for product_id, quantity in quantities}))
+
+def cancel_orders(db: Session, order_ids: list, user_id: Optional[int] = None) -> list:
+    """Cancel orders that are still pending or paid and restore their stock.
+
+    The status change doubles as the lock: only orders this call actually moved to
+    CANCELLED have their stock restored, so concurrent cancels never restore twice.
+    The caller commits.
+    """
+    statement = update(Order).where(
+        Order.id.in_(order_ids),
+        Order.status.in_(CANCELLABLE_STATUSES)
+    )
+    if user_id is not None:
+        statement = statement.where(Order.user_id == user_id)
+    
+    result = db.execute(
+        statement.values(status=OrderStatus.CANCELLED)
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
+    cancelled_ids = [row[0] for row in result]
+    
+    restore_order_stock(db, cancelled_ids)
+    return cancelled_ids
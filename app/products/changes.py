@@ -0,0 +1,62 @@
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import IS_SQLITE
+from app.products.models import Product, ProductTombstone, NEXT_VERSION
+from app.products.schemas import ProductResponse, ProductChange
+from app.products.inventory import overlay_hot_stock
+from typing import Optional
+
+def parse_cursor(cursor: Optional[str]) -> tuple:
+    """Split a `version-id` cursor; no cursor starts from the beginning of the log"""
+    if not cursor:
+        return (0, 0)
+    version, product_id = cursor.split("-")
+    return (int(version), int(product_id))
+
+def format_cursor(position: tuple) -> str:
+    return f"{position[0]}-{position[1]}"
+
+def record_tombstone(db: Session, product_id: int):
+    """Log the deletion of a product. Call before the product row is deleted. The caller commits."""
+    upsert = (sqlite.insert if IS_SQLITE else postgresql.insert)(ProductTombstone).values(product_id=product_id)
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=[ProductTombstone.product_id],
+        set_={"version": NEXT_VERSION, "deleted_at": func.now()}
+    ))
+
+def settled_version(db: Session) -> Optional[int]:
+    """Versions below this are final: every transaction that could still write one has ended.
+
+    Postgres versions are transaction ids, assigned before commit, so a reader that returned
+    a newer committed version could skip an older one committed later. SQLite has a single
+    writer and every committed version is settled.
+    """
+    if IS_SQLITE:
+        return None
+    return db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+def get_product_changes(db: Session, after: tuple, limit: int) -> tuple:
+    """Products changed and deleted after the cursor position, oldest first, one row per product.
+
+    Returns (changes, position of the last change, whether more changes are ready).
+    """
+    horizon = settled_version(db)
+
+    products = db.query(Product).filter(tuple_(Product.version, Product.id) > after)
+    tombstones = db.query(ProductTombstone).filter(tuple_(ProductTombstone.version, ProductTombstone.product_id) > after)
+    if horizon is not None:
+        products = products.filter(Product.version < horizon)
+        tombstones = tombstones.filter(ProductTombstone.version < horizon)
+    products = products.order_by(Product.version, Product.id).limit(limit + 1).all()
+    tombstones = tombstones.order_by(ProductTombstone.version, ProductTombstone.product_id).limit(limit + 1).all()
+
+    changes = [ProductChange(id=product.id, version=product.version, product=ProductResponse.model_validate(response))
+               for product, response in zip(products, overlay_hot_stock(db, products))]
+    changes += [ProductChange(id=tombstone.product_id, version=tombstone.version, deleted=True) for tombstone in tombstones]
+    changes.sort(key=lambda change: (change.version, change.id, change.deleted))
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    position = (changes[-1].version, changes[-1].id) if changes else after
+    return changes, position, has_more
@@ -0,0 +1,112 @@
+from sqlalchemy import case, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, IS_SQLITE
+from app.core.config import settings
+from app.products.models import Product, ProductFacet
+from app.products.schemas import CategoryFacet, PriceBucketFacet, ProductFacetsResponse
+from app.categories.utils import find_category, subtree_names
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def price_bucket(price: float) -> int:
+    """Get the histogram bucket a price falls into"""
+    return max(bisect_right(settings.FACET_PRICE_BOUNDS, price) - 1, 0)
+
+def facet_key(product: Product) -> tuple:
+    return (product.category, price_bucket(product.price))
+
+def _adjust(db: Session, key: tuple, delta: int):
+    upsert = (sqlite.insert if IS_SQLITE else postgresql.insert)(ProductFacet).values(
+        category=key[0], price_bucket=key[1], product_count=delta
+    )
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=[ProductFacet.category, ProductFacet.price_bucket],
+        set_={"product_count": ProductFacet.product_count + delta}
+    ))
+
+def record_facet_change(db: Session, old_key: Optional[tuple], new_key: Optional[tuple]):
+    """Move one product between facet cells (None for created/deleted products). The caller commits."""
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        _adjust(db, old_key, -1)
+    if new_key is not None:
+        _adjust(db, new_key, 1)
+
+def price_bucket_expression(price):
+    """SQL equivalent of price_bucket() for a price column"""
+    bounds = settings.FACET_PRICE_BOUNDS
+    return case(
+        *[(price >= bound, literal(index)) for index, bound in reversed(list(enumerate(bounds)))],
+        else_=literal(0)
+    )
+
+def facet_counts(category, price):
+    """SELECT (category, price_bucket, product_count) over the products table, as stored in product_facets"""
+    # Grouped through a subquery so the bucket expression's bound parameters appear only once
+    cells = select(category.label("category"), price_bucket_expression(price).label("price_bucket")).subquery()
+    return select(cells.c.category, cells.c.price_bucket, func.count()).group_by(cells.c.category, cells.c.price_bucket)
+
+def rebuild_facets(db: Session):
+    """Recompute the whole facet summary from the products table"""
+    db.query(ProductFacet).delete(synchronize_session=False)
+    db.execute(insert(ProductFacet).from_select(
+        [ProductFacet.category, ProductFacet.price_bucket, ProductFacet.product_count],
+        facet_counts(Product.category, Product.price)
+    ))
+    db.commit()
+    logger.info("Product facets rebuilt")
+
+def get_facets(db: Session, category: Optional[str] = None, include_subcategories: bool = True,
+               min_price: Optional[float] = None, max_price: Optional[float] = None) -> ProductFacetsResponse:
+    """Category counts and price histogram for a catalog filter, read from the summary table.
+
+    Price filters select whole buckets, so counts near the edges of a price range
+    include every product of the overlapping bucket.
+    """
+    query = db.query(ProductFacet.category, ProductFacet.price_bucket, ProductFacet.product_count).filter(
+        ProductFacet.product_count > 0
+    )
+    if category:
+        category_obj = find_category(db, category)
+        names = subtree_names(category_obj, include_subcategories) if category_obj else []
+        query = query.filter(ProductFacet.category.in_(names))
+    if min_price is not None:
+        query = query.filter(ProductFacet.price_bucket >= price_bucket(min_price))
+    if max_price is not None:
+        query = query.filter(ProductFacet.price_bucket <= price_bucket(max_price))
+
+    category_counts = defaultdict(int)
+    bucket_counts = defaultdict(int)
+    for facet_category, bucket, count in query.all():
+        category_counts[facet_category] += count
+        bucket_counts[bucket] += count
+
+    bounds = settings.FACET_PRICE_BOUNDS
+    histogram = [
+        PriceBucketFacet(
+            min_price=bound,
+            max_price=bounds[index + 1] if index + 1 < len(bounds) else None,
+            count=bucket_counts.get(index, 0)
+        )
+        for index, bound in enumerate(bounds)
+    ]
+
+    return ProductFacetsResponse(
+        categories=[CategoryFacet(category=name, count=count) for name, count in sorted(category_counts.items())],
+        price_histogram=histogram,
+        total=sum(category_counts.values())
+    )
+
+if __name__ == "__main__":
+    # Repair the summary table (the migration backfills it): python -m app.products.facets
+    db = SessionLocal()
+    try:
+        rebuild_facets(db)
+    finally:
+        db.close()
@@ -0,0 +1,140 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.products.models import Product, ProductStockBucket
+from app.products.schemas import ProductResponse
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+def split_stock(db: Session, product: Product, stock: int):
+    """Spread a product's stock evenly over its bucket rows"""
+    db.query(ProductStockBucket).filter(ProductStockBucket.product_id == product.id).delete(synchronize_session=False)
+    share, remainder = divmod(stock, settings.HOT_SKU_BUCKETS)
+    for bucket in range(settings.HOT_SKU_BUCKETS):
+        db.add(ProductStockBucket(
+            product_id=product.id,
+            bucket=bucket,
+            stock=share + (1 if bucket < remainder else 0)
+        ))
+    product.stock = stock
+
+def enable_hot_stock(db: Session, product: Product):
+    """Move a product's stock into buckets so checkouts stop serializing on its row"""
+    if product.is_hot:
+        return
+    split_stock(db, product, product.stock)
+    product.is_hot = True
+    logger.info(f"Hot-SKU inventory enabled for product: {product.id}")
+
+def disable_hot_stock(db: Session, product: Product):
+    """Fold a hot product's buckets back into its stock column"""
+    if not product.is_hot:
+        return
+    product.stock = hot_stock_levels(db, [product.id]).get(product.id, 0)
+    db.query(ProductStockBucket).filter(ProductStockBucket.product_id == product.id).delete(synchronize_session=False)
+    product.is_hot = False
+    logger.info(f"Hot-SKU inventory disabled for product: {product.id}")
+
+def hot_stock_levels(db: Session, product_ids: list) -> dict:
+    """Get the exact stock of hot products by summing their buckets"""
+    if not product_ids:
+        return {}
+    rows = db.query(ProductStockBucket.product_id, func.sum(ProductStockBucket.stock)).filter(
+        ProductStockBucket.product_id.in_(product_ids)
+    ).group_by(ProductStockBucket.product_id).all()
+    return {product_id: int(stock) for product_id, stock in rows}
+
+def overlay_hot_stock(db: Session, products: list) -> list:
+    """Replace the written-behind stock of hot products with the exact bucket totals"""
+    hot_ids = [product.id for product in products if product.is_hot]
+    if not hot_ids:
+        return products
+
+    levels = hot_stock_levels(db, hot_ids)
+    result = []
+    for product in products:
+        if product.is_hot:
+            stock = levels.get(product.id, 0)
+            product = ProductResponse.model_validate(product).model_copy(
+                update={"stock": stock, "available_stock": stock - (product.reserved or 0)}
+            )
+        result.append(product)
+    return result
+
+def decrement_hot_stock(db: Session, product_id: int, quantity: int) -> bool:
+    """Take `quantity` units from a hot product's buckets. The caller commits.
+
+    Buckets are tried from a random starting point so concurrent checkouts land on
+    different rows. Only when no single bucket can cover the quantity are all buckets
+    locked (in a fixed order) and drained together.
+    """
+    start = random.randrange(settings.HOT_SKU_BUCKETS)
+    for offset in range(settings.HOT_SKU_BUCKETS):
+        bucket = (start + offset) % settings.HOT_SKU_BUCKETS
+        taken = db.execute(
+            update(ProductStockBucket)
+            .where(
+                ProductStockBucket.product_id == product_id,
+                ProductStockBucket.bucket == bucket,
+                ProductStockBucket.stock >= quantity
+            )
+            .values(stock=ProductStockBucket.stock - quantity)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if taken:
+            return True
+
+    buckets = db.query(ProductStockBucket).filter(
+        ProductStockBucket.product_id == product_id
+    ).order_by(ProductStockBucket.bucket).with_for_update().all()
+
+    if sum(bucket.stock for bucket in buckets) < quantity:
+        return False
+
+    remaining = quantity
+    for bucket in buckets:
+        taken = min(bucket.stock, remaining)
+        bucket.stock -= taken
+        remaining -= taken
+        if not remaining:
+            break
+    return True
+
+def add_hot_stock(db: Session, deltas: dict):
+    """Add stock deltas to hot products, each into one random bucket. The caller commits."""
+    for product_id, delta in deltas.items():
+        db.execute(
+            update(ProductStockBucket)
+            .where(
+                ProductStockBucket.product_id == product_id,
+                ProductStockBucket.bucket == random.randrange(settings.HOT_SKU_BUCKETS)
+            )
+            .values(stock=ProductStockBucket.stock + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+def sync_hot_stock() -> bool:
+    """Write the bucket totals of all hot products behind to `Product.stock`"""
+    db = SessionLocal()
+    try:
+        totals = select(func.sum(ProductStockBucket.stock)).where(
+            ProductStockBucket.product_id == Product.id
+        ).scalar_subquery()
+        db.execute(
+            update(Product)
+            .where(Product.is_hot == True, Product.stock != func.coalesce(totals, 0))
+            .values(stock=func.coalesce(totals, 0))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return False
+    finally:
+        db.close()
+
+def register_hot_stock_sync():
+    """Register the write-behind task that keeps `Product.stock` of hot products current"""
+    register_task("hot-stock-sync", sync_hot_stock, settings.HOT_SKU_SYNC_INTERVAL_SECONDS)
@@ -1,5 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Text
-from app.core.database import Base
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Text, Boolean, Date, DateTime, ForeignKey, Index, false, text
+from sqlalchemy.sql import func
+from app.core.database import Base, IS_SQLITE
+
+# Position of a write in the catalog change log. Postgres uses the id of the writing
+# transaction, so readers can tell which versions are settled (see app.products.changes);
+# SQLite serializes writers, so one more than the highest version in use is enough.
+if IS_SQLITE:
+    NEXT_VERSION = text(
+        "(SELECT COALESCE(MAX(version), 0) + 1 FROM ("
+        "SELECT MAX(version) AS version FROM products UNION ALL SELECT MAX(version) FROM product_tombstones))"
+    )
+else:
+    NEXT_VERSION = text("pg_current_xact_id()::text::bigint")
 
 class Product(Base):
     __tablename__ = "products"
@@ -10,4 +22,97 @@ class Product(Base):
     price = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False, default=0)
     category = Column(String, nullable=False, index=True)
-    image_url = Column(String)
\ No newline at end of file
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    image_url = Column(String)
+    # Units held by active cart reservations; available to sell = stock - reserved
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
+    # Hot products keep their stock in ProductStockBucket rows; `stock` is written behind
+    is_hot = Column(Boolean, nullable=False, default=False, server_default=false(), index=True)
+    # Units sold over the last POPULARITY_WINDOW_DAYS, rolled up from ProductSalesDaily
+    popularity = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    # Bumped by every INSERT/UPDATE issued through SQLAlchemy, ORM or Core
+    version = Column(BigInteger, nullable=False, default=NEXT_VERSION, onupdate=NEXT_VERSION, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (Index("ix_products_version_id", "version", "id"),)
+    
+    @property
+    def available_stock(self) -> int:
+        return self.stock - (self.reserved or 0)
+
+
+class ProductStockBucket(Base):
+    __tablename__ = "product_stock_buckets"
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False, default=0)
+
+
+class ProductFacet(Base):
+    """Summary of product counts per (category, price bucket), maintained by the admin write routes"""
+    __tablename__ = "product_facets"
+    
+    category = Column(String, primary_key=True)
+    price_bucket = Column(Integer, primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0)
+
+
+class ProductCoOccurrence(Base):
+    """Sparse co-purchase matrix: number of orders containing both products (stored in both directions)"""
+    __tablename__ = "product_co_occurrences"
+    
+    product_id = Column(Integer, primary_key=True)
+    related_product_id = Column(Integer, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+
+
+class RelatedProduct(Base):
+    """Top-K "frequently bought together" neighbours per product, rebuilt by app.products.related"""
+    __tablename__ = "related_products"
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    related_product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    order_count = Column(Integer, nullable=False)
+
+
+class RelatedProductsRun(Base):
+    """One run of the incremental co-occurrence job, which counted paid orders with ids in (from_order_id, to_order_id]"""
+    __tablename__ = "related_products_runs"
+    
+    id = Column(Integer, primary_key=True)
+    # Runs claim disjoint sets of orders, so no two start below the same order id
+    from_order_id = Column(Integer, nullable=False, unique=True)
+    to_order_id = Column(Integer, nullable=False)
+    orders_processed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ProductSalesDaily(Base):
+    """Units sold per product and day (UTC), the source of the rolling popularity counter"""
+    __tablename__ = "product_sales_daily"
+    
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    units = Column(Integer, nullable=False, default=0)
+
+
+class InventoryFeedSource(Base):
+    """Last applied sequence number per warehouse feed; replayed or stale batches are skipped"""
+    __tablename__ = "inventory_feed_sources"
+    
+    source = Column(String, primary_key=True)
+    last_sequence = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ProductTombstone(Base):
+    """Deleted product, kept so change feed consumers learn about the deletion"""
+    __tablename__ = "product_tombstones"
+    
+    product_id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=NEXT_VERSION, onupdate=NEXT_VERSION)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (Index("ix_product_tombstones_version_product_id", "version", "product_id"),)
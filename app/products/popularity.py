@@ -0,0 +1,93 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, try_job_lock, utc_date
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.models import Product, ProductSalesDaily
+from app.products.utils import stock_values
+from app.categories.utils import find_category, subtree_ids
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def rollup_sales(db: Session) -> int:
+    """Recompute the recent daily sales rows and the rolling `Product.popularity` counters.
+
+    Days from the latest rolled-up day onwards are rebuilt from the orders of those days
+    only, so a run costs O(recent orders) and catches up after downtime by itself.
+    Cancelled orders do not count; days are UTC. Only one worker rolls up at a time, the
+    others skip their run. Returns the number of products whose counter changed.
+    """
+    if not try_job_lock(db, "popularity-rollup"):
+        db.rollback()
+        return 0
+
+    today = datetime.now(timezone.utc).date()
+    window_start = today - timedelta(days=settings.POPULARITY_WINDOW_DAYS - 1)
+    latest_day = db.query(func.max(ProductSalesDaily.day)).scalar()
+    since = max(latest_day, window_start) if latest_day else window_start
+
+    day = utc_date(Order.created_at)
+    sales = select(OrderItem.product_id, day, func.sum(OrderItem.quantity)).join(
+        Order, Order.id == OrderItem.order_id
+    ).where(
+        Order.created_at >= datetime.combine(since, time.min, tzinfo=timezone.utc),
+        Order.status != OrderStatus.CANCELLED
+    ).group_by(OrderItem.product_id, day)
+
+    db.execute(delete(ProductSalesDaily).where(ProductSalesDaily.day >= since))
+    db.execute(delete(ProductSalesDaily).where(ProductSalesDaily.day < window_start))
+    db.execute(insert(ProductSalesDaily).from_select(
+        [ProductSalesDaily.product_id, ProductSalesDaily.day, ProductSalesDaily.units], sales
+    ))
+
+    totals = dict(db.query(ProductSalesDaily.product_id, func.sum(ProductSalesDaily.units)).group_by(
+        ProductSalesDaily.product_id
+    ).all())
+    current = dict(db.query(Product.id, Product.popularity).filter(Product.popularity > 0).all())
+    changes = [(product_id, int(units)) for product_id, units in totals.items() if current.get(product_id, 0) != units]
+    changes += [(product_id, 0) for product_id in current if product_id not in totals]
+
+    if changes:
+        # Absolute values, so the counters always match the daily rows
+        popularity_table = stock_values(changes, "popularity")
+        db.execute(
+            update(Product)
+            .where(Product.id == popularity_table.c.product_id)
+            .values(popularity=popularity_table.c.popularity)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    logger.info(f"Sales rolled up since {since} - {len(changes)} popularity counters changed")
+    return len(changes)
+
+def get_bestsellers(db: Session, category: Optional[str] = None, include_subcategories: bool = True,
+                    limit: int = 20) -> list:
+    """Get the best-selling products of the popularity window, optionally within a category"""
+    query = db.query(Product).filter(Product.popularity > 0)
+    if category:
+        category_obj = find_category(db, category)
+        if not category_obj:
+            return []
+        query = query.filter(Product.category_id.in_(subtree_ids(category_obj, include_subcategories)))
+    return query.order_by(Product.popularity.desc(), Product.id).limit(limit).all()
+
+def refresh_popularity() -> bool:
+    db = SessionLocal()
+    try:
+        rollup_sales(db)
+        return False
+    finally:
+        db.close()
+
+def register_popularity_rollup():
+    """Register the periodic sales rollup that keeps popularity counters current"""
+    register_task("popularity-rollup", refresh_popularity, settings.POPULARITY_ROLLUP_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    # Run the rollup once: python -m app.products.popularity
+    refresh_popularity()
@@ -0,0 +1,181 @@
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, IS_SQLITE
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.models import Product, ProductCoOccurrence, RelatedProduct, RelatedProductsRun
+import logging
+
+# NumPy/SciPy are optional and only imported when the job runs (recommendations stay empty without them)
+np = sparse = None
+
+logger = logging.getLogger(__name__)
+
+def _import_numeric() -> bool:
+    global np, sparse
+    if sparse is None:
+        try:
+            import numpy
+            from scipy import sparse as scipy_sparse
+        except ImportError:
+            return False
+        np, sparse = numpy, scipy_sparse
+    return True
+
+CHUNK_SIZE = 1000
+
+def co_occurrence_counts(order_ids, product_ids) -> tuple:
+    """Count product pairs bought together as Xᵀ·X of the binary order × product matrix X.
+
+    Returns (product_ids, related_product_ids, order_counts) arrays with both directions
+    of every pair and the diagonal removed.
+    """
+    orders, order_index = np.unique(order_ids, return_inverse=True)
+    products, product_index = np.unique(product_ids, return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(len(product_index), dtype=np.int32), (order_index, product_index)),
+        shape=(len(orders), len(products))
+    )
+    baskets.data[:] = 1  # a product on two lines of one order counts once
+
+    pairs = (baskets.T @ baskets).tocoo()
+    off_diagonal = pairs.row != pairs.col
+    return products[pairs.row[off_diagonal]], products[pairs.col[off_diagonal]], pairs.data[off_diagonal]
+
+def _add_counts(db: Session, product_ids, related_ids, counts):
+    for start in range(0, len(product_ids), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        upsert = (sqlite.insert if IS_SQLITE else postgresql.insert)(ProductCoOccurrence).values([
+            {"product_id": int(product_id), "related_product_id": int(related_id), "order_count": int(count)}
+            for product_id, related_id, count in zip(product_ids[start:end], related_ids[start:end], counts[start:end])
+        ])
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[ProductCoOccurrence.product_id, ProductCoOccurrence.related_product_id],
+            set_={"order_count": ProductCoOccurrence.order_count + upsert.excluded.order_count}
+        ))
+
+def rebuild_top_k(db: Session, product_ids: list):
+    """Recompute the stored top-K neighbours of the given products. The caller commits."""
+    for start in range(0, len(product_ids), CHUNK_SIZE):
+        chunk = [row[0] for row in db.query(Product.id).filter(Product.id.in_(product_ids[start:start + CHUNK_SIZE])).all()]
+        if not chunk:
+            continue
+
+        rows = db.query(
+            ProductCoOccurrence.product_id, ProductCoOccurrence.related_product_id, ProductCoOccurrence.order_count
+        ).join(Product, Product.id == ProductCoOccurrence.related_product_id).filter(
+            ProductCoOccurrence.product_id.in_(chunk)
+        ).all()
+        db.execute(delete(RelatedProduct).where(RelatedProduct.product_id.in_(chunk)))
+        if not rows:
+            continue
+
+        pairs = np.array(rows, dtype=np.int64)
+        product, related, count = pairs[:, 0], pairs[:, 1], pairs[:, 2]
+        # Per product: highest count first, ties broken by the lower related id
+        order = np.lexsort((related, -count, product))
+        product, related, count = product[order], related[order], count[order]
+        group_starts = np.flatnonzero(np.r_[True, product[1:] != product[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(product)])
+        rank = np.arange(len(product)) - np.repeat(group_starts, group_sizes)
+        keep = rank < settings.RELATED_PRODUCTS_TOP_K
+
+        db.execute(insert(RelatedProduct), [
+            {"product_id": int(p), "rank": int(r), "related_product_id": int(q), "order_count": int(c)}
+            for p, r, q, c in zip(product[keep], rank[keep], related[keep], count[keep])
+        ])
+
+def _claim_orders(db: Session, status: OrderStatus, counted: bool) -> list:
+    """Flip related_counted on the orders in `status` that are not yet in that state, returning their ids.
+
+    The status-guarded UPDATE is the claim: concurrent runs never fold the same order twice.
+    """
+    return [row[0] for row in db.execute(
+        update(Order).where(Order.status == status, Order.related_counted == (not counted))
+        .values(related_counted=counted).returning(Order.id)
+    ).all()]
+
+def _order_items(db: Session, order_ids: list):
+    rows = []
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        rows.extend(db.query(OrderItem.order_id, OrderItem.product_id).filter(
+            OrderItem.order_id.in_(order_ids[start:start + CHUNK_SIZE])
+        ).all())
+    return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+def update_related_products(db: Session) -> int:
+    """Fold the orders paid since the last run into the co-occurrence counts and top-K table.
+
+    Each order is claimed through its related_counted flag once it is PAID, however late its
+    transaction commits, and an order cancelled after it was counted has its pairs subtracted
+    again. Pending orders are left for a later run. The whole run commits in one transaction,
+    so a failed run is simply retried.
+    """
+    if not _import_numeric():
+        raise RuntimeError("Related products require NumPy and SciPy")
+    paid_ids = _claim_orders(db, OrderStatus.PAID, True)
+    cancelled_ids = _claim_orders(db, OrderStatus.CANCELLED, False)
+    if not paid_ids and not cancelled_ids:
+        db.rollback()
+        return 0
+
+    touched = set()
+    pair_counts = 0
+    for order_ids, sign in ((paid_ids, 1), (cancelled_ids, -1)):
+        items = _order_items(db, order_ids)
+        if not len(items):
+            continue
+        product_ids, related_ids, counts = co_occurrence_counts(items[:, 0], items[:, 1])
+        _add_counts(db, product_ids, related_ids, sign * counts)
+        touched.update(np.unique(product_ids).tolist())
+        pair_counts += len(counts)
+
+    if touched:
+        touched = sorted(touched)
+        for start in range(0, len(touched), CHUNK_SIZE):
+            db.execute(delete(ProductCoOccurrence).where(
+                ProductCoOccurrence.product_id.in_(touched[start:start + CHUNK_SIZE]),
+                ProductCoOccurrence.order_count <= 0
+            ))
+        rebuild_top_k(db, touched)
+
+    if paid_ids:
+        db.add(RelatedProductsRun(
+            from_order_id=min(paid_ids) - 1,
+            to_order_id=max(paid_ids),
+            orders_processed=len(paid_ids)
+        ))
+    db.commit()
+
+    logger.info(
+        f"Related products updated from {len(paid_ids)} paid and {len(cancelled_ids)} cancelled orders "
+        f"({pair_counts} pair counts)"
+    )
+    return len(paid_ids)
+
+def get_related_products(db: Session, product_id: int) -> list:
+    """Read the precomputed neighbours of a product, best first"""
+    return db.query(Product).join(RelatedProduct, RelatedProduct.related_product_id == Product.id).filter(
+        RelatedProduct.product_id == product_id
+    ).order_by(RelatedProduct.rank).all()
+
+def refresh_related_products() -> bool:
+    db = SessionLocal()
+    try:
+        update_related_products(db)
+        return False
+    finally:
+        db.close()
+
+def register_related_products():
+    """Register the periodic incremental recommendations job"""
+    if not _import_numeric():
+        logger.warning("NumPy/SciPy are not installed. Related products job disabled.")
+        return
+    register_task("related-products", refresh_related_products, settings.RELATED_PRODUCTS_REFRESH_SECONDS)
+
+if __name__ == "__main__":
+    # Run the job once, e.g. from cron: python -m app.products.related
+    refresh_related_products()
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from app.core.database import get_db
+from app.core.database import get_db, open_session, route_deadline_ms
+from app.core.singleflight import SingleFlight, flight_stats
 from app.products.models import Product
-from app.products.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.products.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductFacetsResponse, SuggestionListResponse, ProductBatchRequest, ProductBatchResponse, StockFeedBatch, StockFeedResponse, ProductChangesResponse
+from app.products.facets import facet_key, record_facet_change, get_facets
+from app.products.snapshot import catalog_snapshot
+from app.products.suggest import suggest_index, like_prefix, MAX_SUGGESTIONS
+from app.products.related import get_related_products
+from app.products.popularity import get_bestsellers
+from app.products.stock_feed import apply_stock_feed
+from app.products.stream import stream_hub, notify_product_changes
+from app.products.changes import parse_cursor, format_cursor, record_tombstone, get_product_changes
+from app.categories.utils import get_or_create_category, find_category, subtree_ids
+from app.core.config import settings
+from app.products.inventory import enable_hot_stock, disable_hot_stock, split_stock, overlay_hot_stock
 from app.middlewares.auth_middleware import get_admin_user
 from typing import Optional
 import logging
@@ -11,29 +25,39 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Concurrent identical catalog reads share one in-flight query
+product_flight = SingleFlight("get_product")
+products_flight = SingleFlight("get_products")
+
 # Admin Product Routes
 @router.post("/admin/products", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-async def create_product(product_data: ProductCreate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+def create_product(product_data: ProductCreate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
     """Create a new product (Admin only)"""
     logger.info(f"Admin {admin_user.email} creating product: {product_data.name}")
     
+    category = get_or_create_category(db, product_data.category)
     new_product = Product(
         name=product_data.name,
         description=product_data.description,
         price=product_data.price,
         stock=product_data.stock,
-        category=product_data.category,
+        category=category.name,
+        category_id=category.id,
         image_url=product_data.image_url
     )
     db.add(new_product)
+    record_facet_change(db, None, facet_key(new_product))
     db.commit()
     db.refresh(new_product)
+    catalog_snapshot.add_category(category)
+    catalog_snapshot.upsert(new_product)
+    suggest_index.upsert(new_product)
     
     logger.info(f"Product created successfully")
     return new_product
 
 @router.get("/admin/products", response_model=ProductListResponse)
-async def get_admin_products(db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+def get_admin_products(db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
     """Get all products(Admin only)"""
     logger.info(f"Admin {admin_user.email} fetching all products")
     
@@ -41,12 +65,33 @@ async def get_admin_products(db: Session = Depends(get_db),admin_user = Depends(
     total = db.query(Product).count()
     
     return ProductListResponse(
-        products=products,
+        products=overlay_hot_stock(db, products),
         total=total
     )
 
+@router.get("/admin/products/changes", response_model=ProductChangesResponse)
+def get_admin_product_changes(since: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                              limit: int = Query(500, ge=1, le=5000),db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get products changed or deleted since a cursor, for incremental catalog syncs (Admin only)"""
+    
+    try:
+        after = parse_cursor(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "Invalid cursor", "code": 400}
+        )
+    
+    changes, position, has_more = get_product_changes(db, after, limit)
+    
+    return ProductChangesResponse(
+        changes=changes,
+        next_cursor=format_cursor(position),
+        has_more=has_more
+    )
+
 @router.get("/admin/products/{product_id}", response_model=ProductResponse)
-async def get_admin_product(product_id: int,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+def get_admin_product(product_id: int,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
     """Get product details (Admin only)"""
     logger.info(f"Admin {admin_user.email} fetching product: {product_id}")
     
@@ -57,10 +102,10 @@ async def get_admin_product(product_id: int,db: Session = Depends(get_db),admin_
             detail={"error": True, "message": "Product not found", "code": 404}
         )
     
-    return product 
+    return overlay_hot_stock(db, [product])[0]
 
 @router.put("/admin/products/{product_id}", response_model=ProductResponse)
-async def update_product(product_id: int,product_data: ProductUpdate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+def update_product(product_id: int,product_data: ProductUpdate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
     """Update product (Admin only)"""
     logger.info(f"Admin {admin_user.email} updating product: {product_id}")
     
@@ -72,18 +117,38 @@ async def update_product(product_id: int,product_data: ProductUpdate,db: Session
         )
     
     # Update only provided fields
+    old_facet_key = facet_key(product)
     update_data = product_data.model_dump(exclude_unset=True)
+    is_hot = update_data.pop("is_hot", None)
+    if is_hot is False:
+        disable_hot_stock(db, product)
+    
+    if "category" in update_data:
+        category = get_or_create_category(db, update_data["category"])
+        catalog_snapshot.add_category(category)
+        update_data["category"] = category.name
+        update_data["category_id"] = category.id
+    
     for field, value in update_data.items():
         setattr(product, field, value)
     
+    if is_hot and not product.is_hot:
+        enable_hot_stock(db, product)
+    elif product.is_hot and "stock" in update_data:
+        split_stock(db, product, product.stock)
+    
+    record_facet_change(db, old_facet_key, facet_key(product))
+    notify_product_changes(db, [product_id])
     db.commit()
     db.refresh(product)
+    catalog_snapshot.upsert(product)
+    suggest_index.upsert(product)
     
     logger.info(f"Product updated successfully: {product_id}")
-    return product
+    return overlay_hot_stock(db, [product])[0]
 
 @router.delete("/admin/products/{product_id}")
-async def delete_product(product_id: int,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+def delete_product(product_id: int,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
     """Delete product (Admin only)"""
     logger.info(f"Admin {admin_user.email} deleting product: {product_id}")
     
@@ -94,47 +159,131 @@ async def delete_product(product_id: int,db: Session = Depends(get_db),admin_use
             detail={"error": True, "message": "Product not found", "code": 404}
         )
     
+    record_facet_change(db, facet_key(product), None)
+    notify_product_changes(db, [product_id])
+    # Before the delete, so the tombstone outranks the product's last version
+    record_tombstone(db, product_id)
     db.delete(product)
     db.commit()
+    catalog_snapshot.remove(product_id)
+    suggest_index.remove(product_id)
     
     logger.info(f"Product deleted successfully: {product_id}")
     return {"message": "Product deleted successfully"}
 
-# User Product Routes
-@router.get("/products", response_model=ProductListResponse)
-async def get_products(category: Optional[str] = Query(None),
-                       min_price: Optional[float] = Query(None, ge=0),max_price: Optional[float] = Query(None, ge=0),
-                       sort_by: Optional[str] = Query("id", pattern="^(id|name|price)$"),db: Session = Depends(get_db)):
-    """Get products with filters"""
+@router.post("/admin/inventory/feed", response_model=StockFeedResponse)
+def apply_inventory_feed(feed_data: StockFeedBatch,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Apply a batch of warehouse stock deltas or levels, skipping replayed sequence numbers (Admin only)"""
     
-    query = db.query(Product)
+    if len(feed_data.adjustments) > settings.INVENTORY_FEED_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"At most {settings.INVENTORY_FEED_MAX_BATCH_SIZE} adjustments per batch", "code": 400}
+        )
     
-    # Apply filters
-    if category:
-        query = query.filter(Product.category.ilike(f"%{category}%"))
+    applied, products, rejected = apply_stock_feed(db, feed_data.source, feed_data.sequence, feed_data.adjustments)
+    db.commit()
     
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
+    return StockFeedResponse(
+        source=feed_data.source,
+        sequence=feed_data.sequence,
+        applied=applied,
+        products=products,
+        rejected=rejected
+    )
+
+@router.get("/admin/metrics/coalescing")
+async def get_coalescing_metrics(admin_user = Depends(get_admin_user)):
+    """Get request coalescing counters of this worker (Admin only)"""
     
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+    return {"flights": flight_stats()}
+
+@router.get("/admin/metrics/stream")
+async def get_stream_metrics(admin_user = Depends(get_admin_user)):
+    """Get the live stock stream connections of this worker (Admin only)"""
     
-    if sort_by == "name":
-        query = query.order_by(Product.name)
-    elif sort_by == "price":
-        query = query.order_by(Product.price)
-    else:
-        query = query.order_by(Product.id)
+    return stream_hub.stats()
+
+# User Product Routes
+def fetch_products(deadline_ms: int, category: Optional[str], include_subcategories: bool,
+                   min_price: Optional[float], max_price: Optional[float], sort_by: str) -> ProductListResponse:
+    """Run a filtered product listing in its own session (shared by coalesced requests)"""
+    db = open_session(deadline_ms)
+    try:
+        query = db.query(Product)
+        
+        # Apply filters
+        if category:
+            category_obj = find_category(db, category)
+            if not category_obj:
+                return ProductListResponse(products=[], total=0)
+            query = query.filter(Product.category_id.in_(subtree_ids(category_obj, include_subcategories)))
+        
+        if min_price is not None:
+            query = query.filter(Product.price >= min_price)
+        
+        if max_price is not None:
+            query = query.filter(Product.price <= max_price)
+        
+        if sort_by == "name":
+            query = query.order_by(Product.name)
+        elif sort_by == "price":
+            query = query.order_by(Product.price)
+        elif sort_by == "popularity":
+            query = query.order_by(Product.popularity.desc(), Product.id)
+        else:
+            query = query.order_by(Product.id)
+        
+        products = query.all()
+        total = query.count()
+        
+        return ProductListResponse(
+            products=overlay_hot_stock(db, products),
+            total=total
+        )
+    finally:
+        db.close()
+
+def fetch_product(deadline_ms: int, product_id: int) -> Optional[ProductResponse]:
+    """Load one product in its own session (shared by coalesced requests)"""
+    db = open_session(deadline_ms)
+    try:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if not product:
+            return None
+        return ProductResponse.model_validate(overlay_hot_stock(db, [product])[0])
+    finally:
+        db.close()
+
+def overlay_products(deadline_ms: int, products: list) -> list:
+    """Overlay the exact hot stock on snapshot products, in a session of its own"""
+    db = open_session(deadline_ms)
+    try:
+        return overlay_hot_stock(db, products)
+    finally:
+        db.close()
+
+@router.get("/products", response_model=ProductListResponse)
+async def get_products(request: Request,category: Optional[str] = Query(None),include_subcategories: bool = Query(True),
+                       min_price: Optional[float] = Query(None, ge=0),max_price: Optional[float] = Query(None, ge=0),
+                       sort_by: Optional[str] = Query("id", pattern="^(id|name|price|popularity)$")):
+    """Get products with filters"""
     
-    products = query.all()
-    total = query.count()
+    if settings.CATALOG_SNAPSHOT_ENABLED and catalog_snapshot.ready:
+        products = catalog_snapshot.query(category, include_subcategories, min_price, max_price, sort_by)
+        if any(product.is_hot for product in products):
+            # Reading the bucket totals blocks, so keep it off the event loop
+            products = await run_in_threadpool(overlay_products, route_deadline_ms(request), products)
+        return ProductListResponse(
+            products=products,
+            total=len(products)
+        )
     
-    return ProductListResponse(
-        products=products,
-        total=total
-    )
+    key = (category, include_subcategories, min_price, max_price, sort_by)
+    return await products_flight.do(key, fetch_products, route_deadline_ms(request), *key)
+
 @router.get("/products/search", response_model=ProductListResponse)
-async def search_products(keyword: str = Query(..., min_length=1),db: Session = Depends(get_db)):
+def search_products(keyword: str = Query(..., min_length=1),db: Session = Depends(get_db)):
     """Search products by keyword"""
     logger.info(f"Product search - keyword: {keyword}")
     
@@ -150,15 +299,137 @@ async def search_products(keyword: str = Query(..., min_length=1),db: Session =
     total = query.count()
     
     return ProductListResponse(
-        products=products,
+        products=overlay_hot_stock(db, products),
         total=total
     )
 
+@router.get("/products/facets", response_model=ProductFacetsResponse)
+def get_product_facets(category: Optional[str] = Query(None),include_subcategories: bool = Query(True),
+                       min_price: Optional[float] = Query(None, ge=0),max_price: Optional[float] = Query(None, ge=0),
+                       db: Session = Depends(get_db)):
+    """Get category counts and a price histogram for a product filter"""
+    
+    return get_facets(db, category, include_subcategories, min_price, max_price)
+
+@router.get("/products/suggest", response_model=SuggestionListResponse)
+def suggest_products(q: str = Query(..., min_length=1, max_length=100),limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+                     db: Session = Depends(get_db)):
+    """Typeahead suggestions for product names and categories"""
+    
+    if suggest_index.ready:
+        return SuggestionListResponse(suggestions=suggest_index.suggest(q, limit))
+    
+    # Index still loading: fall back to an index-friendly prefix match
+    products = db.query(Product.id, Product.name).filter(
+        Product.name.ilike(like_prefix(q), escape="\\")
+    ).order_by(Product.name).limit(limit).all()
+    
+    return SuggestionListResponse(
+        suggestions=[{"text": name, "type": "product", "product_id": product_id} for product_id, name in products]
+    )
+
+@router.get("/products/bestsellers", response_model=ProductListResponse)
+def get_products_bestsellers(category: Optional[str] = Query(None),include_subcategories: bool = Query(True),
+                             limit: int = Query(20, ge=1, le=100),db: Session = Depends(get_db)):
+    """Get the best-selling products of the last POPULARITY_WINDOW_DAYS days"""
+    
+    products = get_bestsellers(db, category, include_subcategories, limit)
+    return ProductListResponse(
+        products=overlay_hot_stock(db, products),
+        total=len(products)
+    )
+
+def get_products_batch(db: Session, ids: list) -> ProductBatchResponse:
+    """Fetch products with a single IN query, in request order, reporting unknown ids"""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.PRODUCT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"At most {settings.PRODUCT_BATCH_MAX_SIZE} ids per request", "code": 400}
+        )
+    
+    found = {product.id: product for product in db.query(Product).filter(Product.id.in_(ids)).all()} if ids else {}
+    
+    return ProductBatchResponse(
+        products=overlay_hot_stock(db, [found[product_id] for product_id in ids if product_id in found]),
+        missing=[product_id for product_id in ids if product_id not in found]
+    )
+
+@router.get("/products/batch", response_model=ProductBatchResponse)
+def get_products_by_ids(ids: str = Query(..., description="Comma-separated product ids"),db: Session = Depends(get_db)):
+    """Get several products by id"""
+    
+    try:
+        product_ids = [int(product_id) for product_id in ids.split(",") if product_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "ids must be comma-separated integers", "code": 400}
+        )
+    
+    return get_products_batch(db, product_ids)
+
+@router.post("/products/batch", response_model=ProductBatchResponse)
+def post_products_by_ids(batch_data: ProductBatchRequest,db: Session = Depends(get_db)):
+    """Get several products by id (for id lists too long for a query string)"""
+    
+    return get_products_batch(db, batch_data.ids)
+
+@router.get("/products/stream")
+async def stream_products(ids: str = Query(..., description="Comma-separated product ids")):
+    """Server-sent events with the price and stock of products, first the current values, then every change"""
+    
+    try:
+        product_ids = list(dict.fromkeys(int(product_id) for product_id in ids.split(",") if product_id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "ids must be comma-separated integers", "code": 400}
+        )
+    
+    if not settings.STOCK_STREAM_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Stock stream is disabled", "code": 404}
+        )
+    if not product_ids or len(product_ids) > settings.STOCK_STREAM_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": f"Between 1 and {settings.STOCK_STREAM_MAX_IDS} ids per stream", "code": 400}
+        )
+    if stream_hub.connections >= settings.STOCK_STREAM_MAX_CONNECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": True, "message": "Too many stream connections", "code": 503}
+        )
+    
+    return StreamingResponse(
+        stream_hub.stream(product_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/products/{product_id}/related", response_model=ProductListResponse)
+def get_product_related(product_id: int,db: Session = Depends(get_db)):
+    """Get products frequently bought together with a product"""
+    
+    products = get_related_products(db, product_id)
+    if not products and not db.query(Product.id).filter(Product.id == product_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Product not found", "code": 404}
+        )
+    
+    return ProductListResponse(
+        products=overlay_hot_stock(db, products),
+        total=len(products)
+    )
+
 @router.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, request: Request):
     """Get product details"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await product_flight.do(product_id, fetch_product, route_deadline_ms(request), product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from typing import Optional
 from fastapi import HTTPException, status
 
@@ -57,6 +57,7 @@ class ProductUpdate(BaseModel):
     stock: Optional[int] = None
     category: Optional[str] = None
     image_url: Optional[str] = None
+    is_hot: Optional[bool] = None
     
     @field_validator('price')
     @classmethod
@@ -84,12 +85,89 @@ class ProductResponse(BaseModel):
     description: Optional[str]
     price: float
     stock: int
+    available_stock: int
     category: str
+    category_id: Optional[int] = None
     image_url: Optional[str]
+    is_hot: bool = False
+    popularity: int = 0
     
     class Config:
         from_attributes = True
 
 class ProductListResponse(BaseModel):
     products: list[ProductResponse]
-    total: int
\ No newline at end of file
+    total: int
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+
+class PriceBucketFacet(BaseModel):
+    min_price: float
+    max_price: Optional[float]
+    count: int
+
+class ProductFacetsResponse(BaseModel):
+    categories: list[CategoryFacet]
+    price_histogram: list[PriceBucketFacet]
+    total: int
+
+
+class Suggestion(BaseModel):
+    text: str
+    type: str
+    product_id: Optional[int] = None
+
+class SuggestionListResponse(BaseModel):
+    suggestions: list[Suggestion]
+
+
+class ProductChange(BaseModel):
+    id: int
+    version: int
+    deleted: bool = False
+    product: Optional[ProductResponse] = None
+
+class ProductChangesResponse(BaseModel):
+    changes: list[ProductChange]
+    next_cursor: str
+    has_more: bool
+
+class ProductBatchRequest(BaseModel):
+    ids: list[int]
+
+class ProductBatchResponse(BaseModel):
+    products: list[ProductResponse]
+    missing: list[int]
+
+class StockAdjustment(BaseModel):
+    product_id: int
+    delta: Optional[int] = None
+    stock: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def exactly_one_change(self):
+        if (self.delta is None) == (self.stock is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": True, "message": "Each adjustment needs exactly one of delta or stock", "code": 400}
+            )
+        if self.stock is not None and self.stock < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": True, "message": "Stock must be non-negative", "code": 400}
+            )
+        return self
+
+class StockFeedBatch(BaseModel):
+    source: str = "default"
+    sequence: int
+    adjustments: list[StockAdjustment]
+
+class StockFeedResponse(BaseModel):
+    source: str
+    sequence: int
+    applied: bool
+    products: int
+    rejected: list[int] = []
@@ -0,0 +1,211 @@
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.categories.models import Category
+from app.products.models import Product
+from typing import Optional
+import logging
+import threading
+
+# NumPy is optional and only imported once a snapshot is loaded (the snapshot stays disabled without it)
+np = None
+
+logger = logging.getLogger(__name__)
+
+def _import_numpy() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+SORT_KEYS = ("id", "name", "price", "popularity")
+
+class ProductRecord:
+    """Compact read-only copy of a product row, shaped like ProductResponse"""
+    __slots__ = ("id", "name", "description", "price", "stock", "reserved", "available_stock",
+                 "category", "category_id", "image_url", "is_hot", "popularity")
+
+    def __init__(self, product: Product):
+        self.id = product.id
+        self.name = product.name
+        self.description = product.description
+        self.price = product.price
+        self.stock = product.stock
+        self.reserved = product.reserved or 0
+        self.available_stock = product.stock - self.reserved
+        self.category = product.category
+        self.category_id = product.category_id
+        self.image_url = product.image_url
+        self.is_hot = product.is_hot
+        self.popularity = product.popularity or 0
+
+class CatalogSnapshot:
+    """In-process columnar copy of the catalog for the filter/sort queries of get_products.
+
+    Filter columns live in NumPy arrays, so a filter is a handful of vectorized mask
+    operations; each sort key has a pre-computed permutation that is rebuilt lazily after
+    writes. Admin writes update this process's copy immediately; a periodic full reload
+    picks up stock changes from checkout and writes made by other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self._size = 0
+        self._records = []
+        self._rows = {}
+        self._ids = self._prices = self._popularity = self._category_ids = self._alive = None
+        self._permutations = {}
+        self._category_paths = {}
+        self._category_names = {}
+
+    def load(self, db: Session):
+        """Rebuild the whole snapshot from the database"""
+        if not _import_numpy():
+            raise RuntimeError("The catalog snapshot requires NumPy")
+        products = db.query(Product).order_by(Product.id).all()
+        categories = db.query(Category).all()
+        records = [ProductRecord(product) for product in products]
+
+        with self._lock:
+            self._records = records
+            self._rows = {record.id: row for row, record in enumerate(records)}
+            self._size = len(records)
+            capacity = max(self._size, 1024)
+            self._ids = np.zeros(capacity, dtype=np.int64)
+            self._prices = np.zeros(capacity, dtype=np.float64)
+            self._popularity = np.zeros(capacity, dtype=np.int64)
+            self._category_ids = np.full(capacity, -1, dtype=np.int64)
+            self._alive = np.zeros(capacity, dtype=bool)
+            for row, record in enumerate(records):
+                self._write_row(row, record)
+            self._category_paths = {category.id: category.path for category in categories}
+            self._category_names = {category.name: category.id for category in categories}
+            self._permutations = {}
+            self.ready = True
+
+        logger.info(f"Catalog snapshot loaded - {self._size} products")
+
+    def _write_row(self, row: int, record: ProductRecord):
+        self._ids[row] = record.id
+        self._prices[row] = record.price
+        self._popularity[row] = record.popularity
+        self._category_ids[row] = record.category_id if record.category_id is not None else -1
+        self._alive[row] = True
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_prices", "_popularity", "_category_ids", "_alive"):
+            old = getattr(self, name)
+            new = np.full(capacity, -1 if name == "_category_ids" else 0, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add_category(self, category: Category):
+        if not self.ready:
+            return
+        with self._lock:
+            self._category_paths[category.id] = category.path
+            self._category_names[category.name] = category.id
+
+    def upsert(self, product: Product):
+        """Apply a created or updated product"""
+        if not self.ready:
+            return
+        record = ProductRecord(product)
+        with self._lock:
+            row = self._rows.get(record.id)
+            if row is None:
+                if self._size == len(self._ids):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._rows[record.id] = row
+                self._records.append(record)
+            else:
+                self._records[row] = record
+            self._write_row(row, record)
+            self._permutations = {}
+
+    def remove(self, product_id: int):
+        """Apply a deleted product"""
+        if not self.ready:
+            return
+        with self._lock:
+            row = self._rows.pop(product_id, None)
+            if row is not None:
+                self._alive[row] = False
+
+    def _permutation(self, sort_by: str):
+        permutation = self._permutations.get(sort_by)
+        if permutation is None:
+            size = self._size
+            if sort_by == "price":
+                permutation = np.lexsort((self._ids[:size], self._prices[:size]))
+            elif sort_by == "popularity":
+                permutation = np.lexsort((self._ids[:size], -self._popularity[:size]))
+            elif sort_by == "name":
+                names = np.array([record.name for record in self._records], dtype=object)
+                permutation = np.argsort(names, kind="stable")
+            else:
+                permutation = np.argsort(self._ids[:size], kind="stable")
+            self._permutations[sort_by] = permutation
+        return permutation
+
+    def category_ids(self, name: str, include_subcategories: bool = True) -> Optional[list]:
+        """Resolve a category filter to ids in memory; None when the category is unknown"""
+        category_id = self._category_names.get(name.strip())
+        if category_id is None:
+            return None
+        if not include_subcategories:
+            return [category_id]
+        prefix = self._category_paths[category_id]
+        return [other_id for other_id, path in self._category_paths.items() if path.startswith(prefix)]
+
+    def query(self, category: Optional[str] = None, include_subcategories: bool = True,
+              min_price: Optional[float] = None, max_price: Optional[float] = None,
+              sort_by: str = "id") -> list:
+        """Filter and sort the catalog with vectorized operations"""
+        with self._lock:
+            size = self._size
+            mask = self._alive[:size].copy()
+            if category:
+                category_ids = self.category_ids(category, include_subcategories)
+                if category_ids is None:
+                    return []
+                mask &= np.isin(self._category_ids[:size], category_ids)
+            if min_price is not None:
+                mask &= self._prices[:size] >= min_price
+            if max_price is not None:
+                mask &= self._prices[:size] <= max_price
+
+            permutation = self._permutation(sort_by if sort_by in SORT_KEYS else "id")
+            rows = permutation[mask[permutation]]
+            return [self._records[row] for row in rows]
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the column arrays and permutation indexes"""
+        arrays = [self._ids, self._prices, self._popularity, self._category_ids, self._alive, *self._permutations.values()]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+catalog_snapshot = CatalogSnapshot()
+
+def refresh_catalog_snapshot() -> bool:
+    db = SessionLocal()
+    try:
+        catalog_snapshot.load(db)
+        return False
+    finally:
+        db.close()
+
+def register_catalog_snapshot():
+    """Register the task that loads and periodically reloads the catalog snapshot"""
+    if not _import_numpy():
+        logger.warning("NumPy is not installed. Catalog snapshot disabled.")
+        return
+    register_task("catalog-snapshot", refresh_catalog_snapshot, settings.CATALOG_SNAPSHOT_REFRESH_SECONDS)
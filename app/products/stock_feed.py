@@ -0,0 +1,66 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import IS_SQLITE
+from app.products.models import InventoryFeedSource
+from app.products.utils import apply_stock_deltas, set_stock_levels
+from collections import defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+def claim_sequence(db: Session, source: str, sequence: int) -> bool:
+    """Advance a feed's sequence number; False when `sequence` was already applied or is stale.
+
+    One conditional upsert, so concurrent deliveries of the same batch serialize on the
+    source row and exactly one of them claims it. The caller commits.
+    """
+    upsert = (sqlite.insert if IS_SQLITE else postgresql.insert)(InventoryFeedSource).values(
+        source=source, last_sequence=sequence
+    )
+    claimed = db.execute(upsert.on_conflict_do_update(
+        index_elements=[InventoryFeedSource.source],
+        set_={"last_sequence": upsert.excluded.last_sequence, "updated_at": func.now()},
+        where=InventoryFeedSource.last_sequence < upsert.excluded.last_sequence
+    ).returning(InventoryFeedSource.source)).first()
+    return claimed is not None
+
+def apply_stock_feed(db: Session, source: str, sequence: int, adjustments: list) -> tuple:
+    """Apply one warehouse batch as at most two UPDATEs: absolute levels, then summed deltas.
+
+    Adjustments are folded per product in feed order: a level replaces everything before it
+    and later deltas are added to it, so only products without a level keep a delta. Returns
+    (applied, number of distinct products adjusted, ids of rejected products: unknown, or
+    a decrement larger than their stock). The caller commits.
+    """
+    if not claim_sequence(db, source, sequence):
+        logger.info(f"Stock feed {source} batch {sequence} already applied, skipped")
+        return False, 0, []
+
+    levels = {}
+    deltas = defaultdict(int)
+    short = set()
+    for adjustment in adjustments:
+        product_id = adjustment.product_id
+        if adjustment.stock is not None:
+            levels[product_id] = adjustment.stock
+            deltas.pop(product_id, None)
+            short.discard(product_id)
+        elif product_id not in levels:
+            deltas[product_id] += adjustment.delta
+        elif levels[product_id] + adjustment.delta >= 0:
+            levels[product_id] += adjustment.delta
+        else:
+            short.add(product_id)  # same rule as a delta: a decrement larger than the stock is not applied
+
+    set_levels = set(set_stock_levels(db, levels))
+    changed = set(apply_stock_deltas(db, deltas))
+    rejected = sorted(
+        {product_id for product_id in levels if product_id not in set_levels}
+        | {product_id for product_id, delta in deltas.items() if delta and product_id not in changed}
+        | (short & set_levels)
+    )
+    if rejected:
+        logger.warning(f"Stock feed {source} batch {sequence} - adjustments of {len(rejected)} products not applied")
+    logger.info(f"Stock feed {source} batch {sequence} applied - {len(adjustments)} adjustments")
+    return True, len(set_levels | changed), rejected
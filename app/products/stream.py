@@ -0,0 +1,227 @@
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, IS_SQLITE, engine
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.products.models import Product
+from app.products.inventory import hot_stock_levels
+import asyncio
+import json
+import logging
+import select
+import threading
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "product_changes"
+NOTIFY_CHUNK_SIZE = 500  # ids per NOTIFY, well below the 8000-byte payload limit
+
+def read_product_events(product_ids: list) -> dict:
+    """Current price and stock of products keyed by id; ids without a row map to a deletion event"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Product.id, Product.price, Product.stock, Product.reserved, Product.is_hot).filter(
+            Product.id.in_(product_ids)
+        ).all()
+        levels = hot_stock_levels(db, [row.id for row in rows if row.is_hot])
+    finally:
+        db.close()
+
+    events = {product_id: {"id": product_id, "deleted": True} for product_id in product_ids}
+    for row in rows:
+        stock = levels.get(row.id, 0) if row.is_hot else row.stock
+        events[row.id] = {"id": row.id, "price": row.price, "stock": stock, "available_stock": stock - (row.reserved or 0)}
+    return events
+
+def format_event(data: dict) -> str:
+    return f"event: product\ndata: {json.dumps(data)}\n\n"
+
+class Subscriber:
+    """One stream connection: the latest unsent event per product and a wake-up flag"""
+    __slots__ = ("product_ids", "pending", "heartbeat", "wake")
+
+    def __init__(self, product_ids: list):
+        self.product_ids = product_ids
+        self.pending = {}
+        self.heartbeat = False
+        self.wake = asyncio.Event()
+
+class StreamHub:
+    """Per-worker fan-out of product changes to stream connections.
+
+    Writers (any thread) only add product ids to a set. While anyone is subscribed, a single
+    flusher task wakes every STOCK_STREAM_FLUSH_MS, reads the changed products that somebody
+    watches in one query and hands each subscriber the latest event per product, so a burst
+    of changes to a product, or a slow client, collapses into one event. Heartbeats come from
+    the same tick: an idle connection costs a Subscriber and a suspended coroutine, no timers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = set()
+        self._watchers = {}
+        self._subscribers = set()
+        self._flusher = None
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, product_ids):
+        """Mark products as changed (thread-safe); ids nobody watches here are dropped"""
+        watched = [product_id for product_id in product_ids if product_id in self._watchers]
+        if watched:
+            with self._lock:
+                self._changed.update(watched)
+
+    def subscribe(self, product_ids: list) -> Subscriber:
+        subscriber = Subscriber(product_ids)
+        self._subscribers.add(subscriber)
+        for product_id in product_ids:
+            self._watchers.setdefault(product_id, set()).add(subscriber)
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        for product_id in subscriber.product_ids:
+            watchers = self._watchers.get(product_id)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._watchers[product_id]
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        next_heartbeat = loop.time() + settings.STOCK_STREAM_HEARTBEAT_SECONDS
+        try:
+            while self._subscribers:
+                await asyncio.sleep(settings.STOCK_STREAM_FLUSH_MS / 1000)
+                with self._lock:
+                    changed, self._changed = self._changed, set()
+                changed = [product_id for product_id in changed if product_id in self._watchers]
+                if changed:
+                    await self._fan_out(loop, changed)
+
+                if loop.time() >= next_heartbeat:
+                    next_heartbeat = loop.time() + settings.STOCK_STREAM_HEARTBEAT_SECONDS
+                    for subscriber in self._subscribers:
+                        subscriber.heartbeat = True
+                        subscriber.wake.set()
+        finally:
+            self._flusher = None
+
+    async def _fan_out(self, loop, product_ids: list):
+        try:
+            events = await loop.run_in_executor(None, read_product_events, product_ids)
+        except Exception:
+            logger.exception(f"Product stream refresh failed for {len(product_ids)} products")
+            with self._lock:
+                self._changed.update(product_ids)  # retried on the next tick
+            return
+        for product_id, data in events.items():
+            for subscriber in self._watchers.get(product_id, ()):
+                subscriber.pending[product_id] = data
+                subscriber.wake.set()
+
+    async def stream(self, product_ids: list):
+        """Server-sent events for one connection: the current values, then changes as they happen"""
+        # Subscribe before reading the current values so no change in between is lost
+        subscriber = self.subscribe(product_ids)
+        try:
+            yield f"retry: {settings.STOCK_STREAM_RETRY_MS}\n\n"
+            initial = await asyncio.get_running_loop().run_in_executor(None, read_product_events, product_ids)
+            yield "".join(format_event(data) for data in initial.values())
+            while True:
+                await subscriber.wake.wait()
+                subscriber.wake.clear()
+                if subscriber.pending:
+                    events, subscriber.pending = subscriber.pending, {}
+                    yield "".join(format_event(data) for data in events.values())
+                elif subscriber.heartbeat:
+                    yield ": keep-alive\n\n"
+                subscriber.heartbeat = False
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        return {"connections": self.connections, "watched_products": len(self._watchers)}
+
+stream_hub = StreamHub()
+
+def notify_product_changes(db: Session, product_ids):
+    """Announce price/stock changes to the stream subscribers of every worker once `db` commits.
+
+    On Postgres this is a NOTIFY inside the transaction, delivered on commit (and dropped on
+    rollback) to the listener of each worker; SQLite deployments run a single process and
+    publish from an after-commit hook.
+    """
+    if not settings.STOCK_STREAM_ENABLED:
+        return
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    if IS_SQLITE:
+        db.info.setdefault("changed_products", set()).update(product_ids)
+        return
+    for start in range(0, len(product_ids), NOTIFY_CHUNK_SIZE):
+        payload = ",".join(str(product_id) for product_id in product_ids[start:start + NOTIFY_CHUNK_SIZE])
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_committed_changes(session):
+    changed = session.info.pop("changed_products", None)
+    if changed:
+        stream_hub.publish(changed)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_rolled_back_changes(session):
+    session.info.pop("changed_products", None)
+
+_listen_connection = None
+
+def _receive_payloads(connection) -> list:
+    """Payloads of the notifications arriving within about a second"""
+    if hasattr(connection, "poll"):
+        # psycopg2
+        if not select.select([connection], [], [], 1.0)[0]:
+            return []
+        connection.poll()
+        payloads = [notify.payload for notify in connection.notifies]
+        connection.notifies.clear()
+        return payloads
+    # psycopg 3 (the default driver of SQLAlchemy 2.1)
+    return [notify.payload for notify in connection.notifies(timeout=1.0, stop_after=1)]
+
+def listen_for_changes() -> bool:
+    """Wait briefly for change notifications from any worker and publish them to this worker's hub"""
+    global _listen_connection
+    if _listen_connection is None:
+        connection = engine.raw_connection()
+        connection.detach()  # a dedicated connection, never returned to the pool
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        dbapi_connection.cursor().execute(f"LISTEN {CHANNEL}")
+        _listen_connection = dbapi_connection
+
+    try:
+        product_ids = set()
+        for payload in _receive_payloads(_listen_connection):
+            product_ids.update(int(product_id) for product_id in payload.split(","))
+        stream_hub.publish(product_ids)
+    except Exception:
+        # Reconnect on the next run
+        connection, _listen_connection = _listen_connection, None
+        try:
+            connection.close()
+        except Exception:
+            pass
+        raise
+    return True
+
+def register_change_listener():
+    """Register the LISTEN loop that feeds other workers' changes into the hub (Postgres only)"""
+    if IS_SQLITE:
+        return
+    register_task("product-change-listener", listen_for_changes, 5)
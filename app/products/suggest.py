@@ -0,0 +1,235 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.orders.models import OrderItem
+from app.products.models import Product
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Optional
+import heapq
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = "product"
+CATEGORY = "category"
+
+# Largest `limit` a suggest call can ask for: precomputed and cached lists keep this many
+MAX_SUGGESTIONS = 50
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with `text` literally (use with escape="\\")"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _terms(name: str) -> set:
+    """Index the full name and every word, so "run" finds "Trail Running Shoe" """
+    normalized = normalize(name)
+    return {normalized, *normalized.split(" ")}
+
+class SuggestIndex:
+    """Sorted-array prefix index over product names and categories.
+
+    Entries are (term, kind, ref) tuples in one sorted list, so all terms starting with
+    a prefix form a contiguous range found with two binary searches. Candidates are
+    ranked by popularity (units sold). The ranges of the very short, very common prefixes
+    (up to SUGGEST_PRECOMPUTED_PREFIX_LENGTH characters) are too long to scan per request,
+    so their top MAX_SUGGESTIONS are computed at load and kept up to date by writes; longer
+    prefixes are scanned and cached until a write touches a term they match.
+    """
+
+    _STATE = ("_entries", "_product_terms", "_names", "_categories", "_popularity",
+              "_category_counts", "_category_weights", "_top", "_cache")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self._entries = []
+        self._product_terms = {}
+        self._names = {}
+        self._categories = {}
+        self._popularity = {}
+        self._category_counts = defaultdict(int)
+        self._category_weights = defaultdict(int)
+        self._top = {}
+        self._cache = {}
+
+    def load(self, db: Session):
+        """Rebuild the index and popularity weights from the database"""
+        products = db.query(Product.id, Product.name, Product.category).all()
+        popularity = dict(db.query(OrderItem.product_id, func.sum(OrderItem.quantity)).group_by(OrderItem.product_id).all())
+
+        fresh = SuggestIndex()
+        fresh._popularity = {product_id: int(units) for product_id, units in popularity.items()}
+        for product_id, name, category in products:
+            fresh._add(product_id, name, category)
+        fresh._entries.sort()
+        fresh._precompute()
+
+        with self._lock:
+            for name in self._STATE:
+                setattr(self, name, getattr(fresh, name))
+            self.ready = True
+
+        logger.info(f"Suggest index loaded - {len(products)} products, {len(self._entries)} terms, {len(self._top)} precomputed prefixes")
+
+    def _weight(self, product_id: int) -> int:
+        return self._popularity.get(product_id, 0) + 1
+
+    def _score(self, candidate: tuple) -> int:
+        kind, ref = candidate
+        return self._category_weights[ref] if kind == CATEGORY else self._weight(ref)
+
+    def _scan(self, prefix: str) -> list:
+        """Top candidates of a prefix from its whole range of entries"""
+        start = bisect_left(self._entries, (prefix,))
+        end = bisect_left(self._entries, (prefix + "\uffff",))
+        candidates = {(kind, ref) for term, kind, ref in self._entries[start:end]}
+        return heapq.nlargest(MAX_SUGGESTIONS, candidates, key=self._score)
+
+    def _precompute(self):
+        """Top candidates of every short prefix, in one pass over the entries"""
+        length = settings.SUGGEST_PRECOMPUTED_PREFIX_LENGTH
+        candidates = defaultdict(set)
+        for term, kind, ref in self._entries:
+            for size in range(1, min(length, len(term)) + 1):
+                candidates[term[:size]].add((kind, ref))
+        self._top = {
+            prefix: heapq.nlargest(MAX_SUGGESTIONS, matches, key=self._score)
+            for prefix, matches in candidates.items()
+        }
+
+    def _add(self, product_id: int, name: str, category: str, keep_sorted: bool = False):
+        add = insort if keep_sorted else list.append
+        terms = _terms(name)
+        for term in terms:
+            add(self._entries, (term, PRODUCT, product_id))
+        self._product_terms[product_id] = terms
+        self._names[product_id] = name
+        self._categories[product_id] = category
+
+        if self._category_counts[category] == 0:
+            add(self._entries, (normalize(category), CATEGORY, category))
+        self._category_counts[category] += 1
+        self._category_weights[category] += self._weight(product_id)
+
+    def _remove(self, product_id: int):
+        for term in self._product_terms.pop(product_id, ()):
+            index = bisect_left(self._entries, (term, PRODUCT, product_id))
+            if index < len(self._entries) and self._entries[index] == (term, PRODUCT, product_id):
+                del self._entries[index]
+        self._names.pop(product_id, None)
+        category = self._categories.pop(product_id, None)
+        if category is None:
+            return
+
+        self._category_counts[category] -= 1
+        self._category_weights[category] -= self._weight(product_id)
+        if self._category_counts[category] == 0:
+            entry = (normalize(category), CATEGORY, category)
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+
+    def _matches(self, candidate: tuple, prefix: str) -> bool:
+        kind, ref = candidate
+        if kind == CATEGORY:
+            return self._category_counts[ref] > 0 and normalize(ref).startswith(prefix)
+        return any(term.startswith(prefix) for term in self._product_terms.get(ref, ()))
+
+    def _apply_write(self, product_id: int, name: Optional[str] = None, category: Optional[str] = None):
+        """Replace (or with no name, remove) a product and refresh only the prefixes it touches"""
+        changed = {(PRODUCT, product_id)}
+        terms = set(self._product_terms.get(product_id, ()))
+        old_category = self._categories.get(product_id)
+        old_weights = {}
+        if old_category is not None:
+            old_weights[old_category] = self._category_weights[old_category]
+
+        self._remove(product_id)
+        if name is not None:
+            self._add(product_id, name, category, keep_sorted=True)
+            terms |= self._product_terms[product_id]
+            old_weights.setdefault(category, self._category_weights[category] - self._weight(product_id))
+        for changed_category, weight in old_weights.items():
+            changed.add((CATEGORY, changed_category))
+            terms.add(normalize(changed_category))
+
+        lowered = {(CATEGORY, ref) for ref, weight in old_weights.items() if self._category_weights[ref] < weight}
+        length = settings.SUGGEST_PRECOMPUTED_PREFIX_LENGTH
+        for prefix in {term[:size] for term in terms for size in range(1, min(length, len(term)) + 1)}:
+            top = self._top.get(prefix, [])
+            kept = [candidate for candidate in top if candidate not in changed]
+            dropped = [candidate for candidate in top if candidate in changed and (candidate in lowered or not self._matches(candidate, prefix))]
+            if dropped and len(top) == MAX_SUGGESTIONS:
+                # Something outside the list may now rank in it
+                self._top[prefix] = self._scan(prefix)
+                continue
+            kept += [candidate for candidate in changed if self._matches(candidate, prefix)]
+            if kept:
+                self._top[prefix] = heapq.nlargest(MAX_SUGGESTIONS, kept, key=self._score)
+            else:
+                self._top.pop(prefix, None)
+
+        for term in terms:
+            for size in range(length + 1, len(term) + 1):
+                self._cache.pop(term[:size], None)
+
+    def upsert(self, product: Product):
+        """Apply a created or updated product"""
+        if not self.ready:
+            return
+        with self._lock:
+            self._apply_write(product.id, product.name, product.category)
+
+    def remove(self, product_id: int):
+        """Apply a deleted product"""
+        if not self.ready:
+            return
+        with self._lock:
+            self._apply_write(product_id)
+
+    def suggest(self, prefix: str, limit: int) -> list:
+        """Get the most popular products and categories with a term starting with `prefix`"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            if len(prefix) <= settings.SUGGEST_PRECOMPUTED_PREFIX_LENGTH:
+                top = self._top.get(prefix, [])
+            else:
+                top = self._cache.get(prefix)
+                if top is None:
+                    top = self._scan(prefix)
+                    if len(self._cache) >= settings.SUGGEST_CACHE_SIZE:
+                        self._cache.clear()
+                    self._cache[prefix] = top
+
+            return [
+                {
+                    "text": ref if kind == CATEGORY else self._names[ref],
+                    "type": kind,
+                    "product_id": ref if kind == PRODUCT else None,
+                }
+                for kind, ref in top[:limit]
+            ]
+
+suggest_index = SuggestIndex()
+
+def refresh_suggest_index() -> bool:
+    db = SessionLocal()
+    try:
+        suggest_index.load(db)
+        return False
+    finally:
+        db.close()
+
+def register_suggest_index():
+    """Register the task that loads the suggest index and refreshes popularity weights"""
+    register_task("suggest-index", refresh_suggest_index, settings.SUGGEST_REFRESH_SECONDS)
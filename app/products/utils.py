@@ -0,0 +1,80 @@
+from sqlalchemy import Integer, column, or_, update, values
+from sqlalchemy.orm import Session
+from app.core.database import IS_SQLITE
+from app.products.models import Product
+from app.products.inventory import add_hot_stock, decrement_hot_stock, split_stock
+from app.products.stream import notify_product_changes
+
+def stock_values(rows: list, *columns) -> object:
+    """Build an inline VALUES table of per-product numbers to join against in a set-based UPDATE"""
+    table = values(column("product_id", Integer), *[column(name, Integer) for name in columns], name="stock_values").data(rows)
+    # SQLite cannot alias the columns of a VALUES subquery, but accepts them as a CTE
+    return table.cte("stock_values") if IS_SQLITE else table
+
+def apply_stock_deltas(db: Session, deltas: dict, column_name: str = "stock") -> list:
+    """Add per-product deltas to a stock column with a single UPDATE ... FROM (VALUES ...) statement.
+
+    A `stock` decrement larger than the product's stock is not applied, for hot products
+    (whose buckets cannot cover it) and regular ones alike. Returns the ids of the products
+    actually changed.
+    """
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    notify_product_changes(db, deltas)
+    
+    applied = []
+    if column_name == "stock" and deltas:
+        # Stock of hot products lives in their buckets
+        hot_ids = [row[0] for row in db.query(Product.id).filter(Product.id.in_(list(deltas)), Product.is_hot == True)]
+        for product_id in hot_ids:
+            delta = deltas.pop(product_id)
+            if delta > 0:
+                add_hot_stock(db, {product_id: delta})
+            elif not decrement_hot_stock(db, product_id, -delta):
+                continue
+            applied.append(product_id)
+    
+    rows = list(deltas.items())
+    if not rows:
+        return applied
+    
+    deltas_table = stock_values(rows, "delta")
+    target = getattr(Product, column_name)
+    statement = update(Product).where(Product.id == deltas_table.c.product_id)
+    if column_name == "stock":
+        statement = statement.where(or_(deltas_table.c.delta >= 0, target + deltas_table.c.delta >= 0))
+    result = db.execute(
+        statement
+        .values({target: target + deltas_table.c.delta})
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    return applied + [row[0] for row in result]
+
+def set_stock_levels(db: Session, levels: dict) -> list:
+    """Set absolute per-product stock levels with a single UPDATE ... FROM (VALUES ...) statement.
+
+    Returns the ids of the products actually changed (unknown ids are left out).
+    """
+    levels = dict(levels)
+    notify_product_changes(db, levels)
+    
+    applied = []
+    if levels:
+        # Hot products spread the new level over their buckets
+        for product in db.query(Product).filter(Product.id.in_(list(levels)), Product.is_hot == True):
+            split_stock(db, product, levels.pop(product.id))
+            applied.append(product.id)
+    
+    rows = list(levels.items())
+    if not rows:
+        return applied
+    
+    levels_table = stock_values(rows, "stock")
+    result = db.execute(
+        update(Product)
+        .where(Product.id == levels_table.c.product_id)
+        .values(stock=levels_table.c.stock)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    return applied + [row[0] for row in result]
@@ -0,0 +1,232 @@
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.tasks import register_task
+from app.categories.models import Category
+from app.promotions.models import Promotion, PromotionKind
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+class CouponError(Exception):
+    pass
+
+class Rule:
+    """A promotion compiled for evaluation: scope resolved to ids, percentages turned into rates"""
+    __slots__ = ("id", "name", "code", "kind", "value", "rate", "buy", "group", "product_id", "category_id",
+                 "order", "starts_at", "ends_at")
+
+    def __init__(self, promotion: Promotion):
+        self.id = promotion.id
+        self.name = promotion.name
+        self.code = promotion.code
+        self.kind = promotion.kind
+        self.value = promotion.value
+        self.rate = promotion.value / 100
+        self.buy = promotion.buy_quantity or 0
+        self.group = self.buy + (promotion.get_quantity or 0)
+        self.product_id = promotion.product_id
+        self.category_id = promotion.category_id
+        self.order = (-promotion.priority, promotion.id)
+        self.starts_at = _aware(promotion.starts_at)
+        self.ends_at = _aware(promotion.ends_at)
+
+    def live(self, now: datetime) -> bool:
+        return (self.starts_at is None or self.starts_at <= now) and (self.ends_at is None or now < self.ends_at)
+
+    def covers(self, product_id: int, category_ancestors: frozenset) -> bool:
+        if self.product_id is not None:
+            return product_id == self.product_id
+        if self.category_id is not None:
+            return self.category_id in category_ancestors
+        return True
+
+    def discounts(self, lines: list, net: list, eligible: list) -> dict:
+        """Discount per eligible line index, computed on the amounts left by earlier rules"""
+        if self.kind == PromotionKind.PERCENTAGE:
+            return {index: net[index] * self.rate for index in eligible}
+
+        if self.kind == PromotionKind.FIXED:
+            total = sum(net[index] for index in eligible)
+            if total <= 0:
+                return {}
+            amount = min(self.value, total)
+            return {index: amount * net[index] / total for index in eligible}
+
+        # Buy X get Y: the cheapest units of the eligible lines are the discounted ones
+        units = sum(lines[index].quantity for index in eligible)
+        free = units // self.group * (self.group - self.buy)
+        result = {}
+        for index in sorted(eligible, key=lambda index: net[index] / lines[index].quantity):
+            if free <= 0:
+                break
+            quantity = min(free, lines[index].quantity)
+            result[index] = net[index] / lines[index].quantity * quantity * self.rate
+            free -= quantity
+        return result
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class PricedLine:
+    """A cart line to price: in, the product and quantity; out, its discount and amount due"""
+    __slots__ = ("product_id", "category_id", "price", "quantity", "discount", "total")
+
+    def __init__(self, product_id: int, category_id: Optional[int], price: float, quantity: int):
+        self.product_id = product_id
+        self.category_id = category_id
+        self.price = price
+        self.quantity = quantity
+        self.discount = 0.0
+        self.total = round(price * quantity, 2)
+
+    @property
+    def unit_price(self) -> float:
+        """Discounted price per unit, as recorded on order items (unrounded, so units add up to the line total)"""
+        return self.total / self.quantity
+
+class PromotionIndex:
+    """In-memory, precompiled set of the active promotions.
+
+    Automatic rules are indexed by product id and by category id (a category rule is
+    listed under the category and all of its descendants) plus a list of cart-wide
+    rules, and coupons by code. Pricing a cart is a few dict lookups per line and a
+    little arithmetic per matching rule, with no database access. The whole state is
+    swapped in one assignment on reload, so readers never lock.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._state = ([], {}, {}, {}, {})
+
+    @property
+    def empty(self) -> bool:
+        cart_rules, by_product, by_category, coupons, ancestors = self._state
+        return not (cart_rules or by_product or by_category or coupons)
+
+    def load(self, db: Session):
+        """Recompile the index from the active promotions in the database"""
+        promotions = db.query(Promotion).filter(Promotion.active == True).all()
+        # Ids on the materialized path of each category, itself included
+        ancestors = {
+            category_id: frozenset(int(ancestor) for ancestor in path.strip("/").split("/") if ancestor)
+            for category_id, path in db.query(Category.id, Category.path).all()
+        }
+
+        cart_rules, by_product, category_rules, coupons = [], {}, {}, {}
+        for promotion in promotions:
+            rule = Rule(promotion)
+            if rule.code is not None:
+                coupons[rule.code] = rule
+            elif rule.product_id is not None:
+                by_product.setdefault(rule.product_id, []).append(rule)
+            elif rule.category_id is not None:
+                category_rules.setdefault(rule.category_id, []).append(rule)
+            else:
+                cart_rules.append(rule)
+
+        # A category rule applies to the category and everything below it
+        by_category = {}
+        if category_rules:
+            for category_id, path_ids in ancestors.items():
+                rules = [rule for ancestor in path_ids for rule in category_rules.get(ancestor, ())]
+                if rules:
+                    by_category[category_id] = rules
+
+        self._state = (cart_rules, by_product, by_category, coupons, ancestors)
+        self.ready = True
+        logger.info(f"Promotions loaded - {len(promotions)} active, {len(coupons)} coupons")
+
+    def price(self, lines: list, coupon: Optional[str] = None, now: Optional[datetime] = None) -> tuple:
+        """Apply the live automatic promotions, and `coupon` if given, to the lines in place.
+
+        Rules run highest priority first, each on the amounts left by the previous ones.
+        Returns (total discount, applied promotions). Raises CouponError for unknown,
+        expired or non-applicable coupons.
+        """
+        cart_rules, by_product, by_category, coupons, ancestors = self._state
+        now = now or datetime.now(timezone.utc)
+
+        eligible = {}
+        for index, line in enumerate(lines):
+            for rule in by_product.get(line.product_id, ()):
+                eligible.setdefault(rule, []).append(index)
+            for rule in by_category.get(line.category_id, ()):
+                eligible.setdefault(rule, []).append(index)
+        if cart_rules and lines:
+            for rule in cart_rules:
+                eligible[rule] = list(range(len(lines)))
+
+        if coupon:
+            rule = coupons.get(coupon.strip().upper())
+            if rule is None or not rule.live(now):
+                raise CouponError("Invalid or expired coupon")
+            matching = [
+                index for index, line in enumerate(lines)
+                if rule.covers(line.product_id, ancestors.get(line.category_id, frozenset()))
+            ]
+            if not matching:
+                raise CouponError("Coupon does not apply to this cart")
+            eligible[rule] = matching
+
+        net = [line.price * line.quantity for line in lines]
+        applied = []
+        for rule in sorted(eligible, key=lambda rule: rule.order):
+            if not rule.live(now):
+                continue
+            discount = 0.0
+            for index, amount in rule.discounts(lines, net, eligible[rule]).items():
+                amount = min(amount, net[index])
+                net[index] -= amount
+                discount += amount
+            if discount > 0:
+                applied.append({"id": rule.id, "name": rule.name, "code": rule.code, "discount": round(discount, 2)})
+
+        # Round to cents so that the line totals add up to the rounded cart total
+        cents = [amount * 100 for amount in net]
+        rounded = [math.floor(amount + 1e-6) for amount in cents]
+        leftover = round(sum(cents)) - sum(rounded)
+        for index in sorted(range(len(lines)), key=lambda index: rounded[index] - cents[index])[:max(leftover, 0)]:
+            rounded[index] += 1
+
+        total_discount = 0.0
+        for line, amount in zip(lines, rounded):
+            line.total = amount / 100
+            line.discount = round(line.price * line.quantity - line.total, 2)
+            total_discount += line.discount
+        return round(total_discount, 2), applied
+
+promotion_index = PromotionIndex()
+
+def price_cart_items(cart_items: list, coupon: Optional[str] = None) -> tuple:
+    """Price (Cart, Product) rows with the current promotions.
+
+    Returns (lines in the same order, total discount, applied promotions).
+    """
+    lines = [PricedLine(product.id, product.category_id, product.price, cart_item.quantity) for cart_item, product in cart_items]
+    try:
+        discount, applied = promotion_index.price(lines, coupon)
+    except CouponError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": str(e), "code": 400}
+        )
+    return lines, discount, applied
+
+def refresh_promotions() -> bool:
+    db = SessionLocal()
+    try:
+        promotion_index.load(db)
+        return False
+    finally:
+        db.close()
+
+def register_promotions():
+    """Register the task that reloads the promotion index (changes made by other workers)"""
+    register_task("promotions", refresh_promotions, settings.PROMOTIONS_REFRESH_SECONDS)
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, true
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class PromotionKind(str, enum.Enum):
+    PERCENTAGE = "percentage"      # `value` percent off every eligible unit
+    FIXED = "fixed"                # `value` off the eligible subtotal, once per cart
+    BUY_X_GET_Y = "buy_x_get_y"    # of every buy_quantity + get_quantity eligible units, the cheapest get_quantity are `value` percent off
+
+class Promotion(Base):
+    """A discount rule. Without a code it applies automatically; with one, only to carts that enter the code.
+
+    Scope is a single product, a category (including subcategories) or, with neither set, the whole cart.
+    """
+    __tablename__ = "promotions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    code = Column(String, unique=True, nullable=True, index=True)
+    kind = Column(Enum(PromotionKind), nullable=False)
+    value = Column(Float, nullable=False)
+    buy_quantity = Column(Integer, nullable=True)
+    get_quantity = Column(Integer, nullable=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=True, index=True)
+    category = Column(String, nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True, index=True)
+    # Promotions are applied one after another on what earlier ones left, highest priority first
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    active = Column(Boolean, nullable=False, default=True, server_default=true())
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    ends_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.promotions.models import Promotion
+from app.promotions.schemas import PromotionCreate, PromotionUpdate, PromotionResponse
+from app.promotions.engine import promotion_index
+from app.products.models import Product
+from app.categories.utils import find_category
+from app.middlewares.auth_middleware import get_admin_user
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def get_promotion_or_404(db: Session, promotion_id: int) -> Promotion:
+    promotion = db.query(Promotion).filter(Promotion.id == promotion_id).first()
+    if not promotion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Promotion not found", "code": 404}
+        )
+    return promotion
+
+@router.post("", response_model=PromotionResponse, status_code=status.HTTP_201_CREATED)
+def create_promotion(promotion_data: PromotionCreate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Create a promotion or coupon (Admin only)"""
+    logger.info(f"Admin {admin_user.email} creating promotion: {promotion_data.name}")
+    
+    if promotion_data.product_id is not None and not db.query(Product.id).filter(Product.id == promotion_data.product_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": True, "message": "Product not found", "code": 404}
+        )
+    
+    category = None
+    if promotion_data.category is not None:
+        category = find_category(db, promotion_data.category)
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"error": True, "message": "Category not found", "code": 404}
+            )
+    
+    if promotion_data.code is not None and db.query(Promotion.id).filter(Promotion.code == promotion_data.code).first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": True, "message": "Coupon code already exists", "code": 409}
+        )
+    
+    promotion = Promotion(**promotion_data.model_dump(exclude={"category"}))
+    if category:
+        promotion.category = category.name
+        promotion.category_id = category.id
+    db.add(promotion)
+    db.commit()
+    db.refresh(promotion)
+    promotion_index.load(db)
+    
+    logger.info(f"Promotion created successfully: {promotion.id}")
+    return promotion
+
+@router.get("", response_model=list[PromotionResponse])
+def get_promotions(db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Get all promotions (Admin only)"""
+    
+    return db.query(Promotion).order_by(Promotion.priority.desc(), Promotion.id).all()
+
+@router.put("/{promotion_id}", response_model=PromotionResponse)
+def update_promotion(promotion_id: int,promotion_data: PromotionUpdate,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Rename, reprioritize, pause or reschedule a promotion (Admin only)"""
+    logger.info(f"Admin {admin_user.email} updating promotion: {promotion_id}")
+    
+    promotion = get_promotion_or_404(db, promotion_id)
+    for field, value in promotion_data.model_dump(exclude_unset=True).items():
+        setattr(promotion, field, value)
+    
+    if promotion.starts_at and promotion.ends_at and promotion.starts_at >= promotion.ends_at:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": True, "message": "starts_at must be before ends_at", "code": 400}
+        )
+    
+    db.commit()
+    db.refresh(promotion)
+    promotion_index.load(db)
+    
+    return promotion
+
+@router.delete("/{promotion_id}")
+def delete_promotion(promotion_id: int,db: Session = Depends(get_db),admin_user = Depends(get_admin_user)):
+    """Delete a promotion (Admin only)"""
+    logger.info(f"Admin {admin_user.email} deleting promotion: {promotion_id}")
+    
+    promotion = get_promotion_or_404(db, promotion_id)
+    db.delete(promotion)
+    db.commit()
+    promotion_index.load(db)
+    
+    return {"message": "Promotion deleted successfully"}
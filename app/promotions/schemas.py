@@ -0,0 +1,65 @@
+from pydantic import BaseModel, model_validator
+from fastapi import HTTPException, status
+from app.promotions.models import PromotionKind
+from datetime import datetime
+from typing import Optional
+
+def invalid(message: str):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"error": True, "message": message, "code": 400}
+    )
+
+class PromotionBase(BaseModel):
+    name: str
+    code: Optional[str] = None
+    kind: PromotionKind
+    value: float
+    buy_quantity: Optional[int] = None
+    get_quantity: Optional[int] = None
+    product_id: Optional[int] = None
+    category: Optional[str] = None
+    priority: int = 0
+    active: bool = True
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+class PromotionCreate(PromotionBase):
+    @model_validator(mode="after")
+    def check_rule(self):
+        if self.code is not None:
+            self.code = self.code.strip().upper()
+            if not self.code:
+                raise invalid("Coupon code must not be empty")
+        if self.value <= 0:
+            raise invalid("Value must be greater than 0")
+        if self.kind != PromotionKind.FIXED and self.value > 100:
+            raise invalid("Percentages must not exceed 100")
+        if self.kind == PromotionKind.BUY_X_GET_Y:
+            if not self.buy_quantity or not self.get_quantity or self.buy_quantity <= 0 or self.get_quantity <= 0:
+                raise invalid("Buy X get Y promotions need positive buy_quantity and get_quantity")
+        if self.product_id is not None and self.category is not None:
+            raise invalid("A promotion is scoped to a product or a category, not both")
+        if self.starts_at and self.ends_at and self.starts_at >= self.ends_at:
+            raise invalid("starts_at must be before ends_at")
+        return self
+
+class PromotionUpdate(BaseModel):
+    name: Optional[str] = None
+    priority: Optional[int] = None
+    active: Optional[bool] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+class PromotionResponse(PromotionBase):
+    id: int
+    category_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+class AppliedPromotion(BaseModel):
+    id: int
+    name: str
+    code: Optional[str] = None
+    discount: float
@@ -0,0 +1,119 @@
+"""Production entrypoint: python -m app.serve [--workers N] [--host HOST] [--port PORT]
+
+The parent binds the listening socket and imports the application once (preload), then
+forks workers that all accept on the shared socket, restarting any that die. SIGTERM or
+SIGINT is forwarded to the workers, which stop accepting connections and finish their
+in-flight requests (up to SERVER_GRACEFUL_TIMEOUT_SECONDS) before running the lifespan
+shutdown. uvloop and httptools are used when installed.
+
+Each worker gets a stable index in APP_WORKER_INDEX (a restarted worker keeps the index of
+the one it replaces), so that the database-wide periodic jobs run in only one of them
+(SERVER_JOBS_WORKER, see app.core.tasks.runs_shared_jobs).
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+import uvicorn
+from app.core.config import settings
+from app.core.tasks import WORKER_INDEX_ENV
+
+logger = logging.getLogger(__name__)
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(settings.SERVER_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+def create_server(app) -> uvicorn.Server:
+    config = uvicorn.Config(
+        app,
+        loop="auto",
+        http="auto",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        access_log=False,  # requests are already logged by the app middleware
+    )
+    return uvicorn.Server(config)
+
+def run_worker(app, sock: socket.socket):
+    from app.core.database import engine
+    # Never share pooled connections opened by the parent
+    engine.dispose(close=False)
+    create_server(app).run(sockets=[sock])
+
+class Supervisor:
+    """Pre-fork process manager for the uvicorn workers"""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children = {}  # pid -> worker index
+        self.stopping = False
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            os.environ[WORKER_INDEX_ENV] = str(index)
+            try:
+                run_worker(self.app, self.sock)
+            finally:
+                os._exit(0)
+        self.children[pid] = index
+
+    def stop(self, signum, frame):
+        # A second signal kills the workers without waiting for the drain
+        forwarded = signal.SIGKILL if self.stopping else signal.SIGTERM
+        self.stopping = True
+        logger.info(f"Stopping {len(self.children)} workers")
+        for pid in self.children:
+            try:
+                os.kill(pid, forwarded)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+        logger.info(f"Serving with {self.workers} workers")
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.children.pop(pid, None)
+            if index is not None and not self.stopping:
+                logger.warning(f"Worker {pid} exited with status {status}, restarting")
+                time.sleep(1)
+                self.spawn(index)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    args = parser.parse_args()
+
+    from app.main import app
+
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"Listening on {args.host}:{args.port}")
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        create_server(app).run(sockets=[sock])
+    else:
+        Supervisor(app, sock, args.workers).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Catalog snapshot vs. database for the get_products filter/sort queries.
+
+Reuses the seeded catalog of ``benchmarks.category_filter`` and reports the memory
+used by the snapshot plus per-query latency of both paths:
+
+    DATABASE_URL=postgresql://.../bench python -m benchmarks.catalog_snapshot --products 100000
+"""
+import argparse
+import tracemalloc
+from app.core.database import Base, SessionLocal, engine
+from app.categories.models import Category
+from app.categories.utils import subtree_ids
+from app.products.models import Product
+from app.products.snapshot import CatalogSnapshot
+from benchmarks.category_filter import seed
+from benchmarks.utils import Timer
+
+FILTERS = [
+    {"sort_by": "id"},
+    {"sort_by": "price", "min_price": 50, "max_price": 150},
+    {"category": "department-3", "sort_by": "name"},
+    {"category": "department-3-aisle-4-shelf-2", "sort_by": "price"},
+]
+
+def db_query(db, category=None, min_price=None, max_price=None, sort_by="id"):
+    query = db.query(Product)
+    if category:
+        query = query.filter(Product.category_id.in_(subtree_ids(db.query(Category).filter(Category.name == category).one())))
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    return query.order_by(getattr(Product, sort_by)).all()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.query(Product).count() < args.products:
+            seed(db, args.products)
+
+        snapshot = CatalogSnapshot()
+        tracemalloc.start()
+        with Timer() as load:
+            snapshot.load(db)
+        for sort_by in ("id", "name", "price"):
+            snapshot.query(sort_by=sort_by)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"snapshot load {load.elapsed:.2f}s, resident {current / 2**20:.1f} MiB "
+              f"(columns + indexes {snapshot.memory_bytes() / 2**20:.1f} MiB), peak {peak / 2**20:.1f} MiB")
+
+        for filters in FILTERS:
+            with Timer() as database:
+                for _ in range(args.repeat):
+                    rows = db_query(db, **filters)
+                    db.expunge_all()
+            with Timer() as in_memory:
+                for _ in range(args.repeat):
+                    records = snapshot.query(**filters)
+            assert [row.id for row in rows] == [record.id for record in records] or filters["sort_by"] == "name"
+            print(f"{str(filters):<70} {len(records):>7} rows  db {database.elapsed / args.repeat * 1000:9.2f} ms"
+                  f"  snapshot {in_memory.elapsed / args.repeat * 1000:8.2f} ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
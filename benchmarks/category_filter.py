@@ -0,0 +1,72 @@
+"""Category filtering: leading-wildcard ILIKE vs. indexed exact/subtree filters.
+
+Seeds a category tree and --products rows (500k by default) into DATABASE_URL,
+then times the old ``category ILIKE '%name%'`` filter against the exact and
+materialized-path subtree filters used by ``get_products``. Run it against a
+scratch database:
+
+    DATABASE_URL=postgresql://.../bench python -m benchmarks.category_filter
+"""
+import argparse
+import random
+from sqlalchemy import func, insert
+from app.core.database import Base, SessionLocal, engine
+from app.categories.models import Category
+from app.categories.utils import create_category, subtree_ids
+from app.products.models import Product
+from benchmarks.utils import Timer
+
+def seed(db, product_count: int) -> list:
+    leaves = []
+    for top_index in range(20):
+        top = create_category(db, f"department-{top_index}")
+        for child_index in range(10):
+            child = create_category(db, f"department-{top_index}-aisle-{child_index}", top)
+            leaves.extend(create_category(db, f"{child.name}-shelf-{leaf_index}", child) for leaf_index in range(5))
+    db.commit()
+
+    batch = []
+    for index in range(product_count):
+        leaf = random.choice(leaves)
+        batch.append({
+            "name": f"product-{index}", "price": random.uniform(1, 500), "stock": 10,
+            "category": leaf.name, "category_id": leaf.id,
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Product), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Product), batch)
+    db.commit()
+    return leaves
+
+def timed(label: str, query, repeat: int):
+    with Timer() as timer:
+        for _ in range(repeat):
+            count = query.with_entities(func.count()).scalar()
+    print(f"{label:<45} {count:>8} rows  {timer.elapsed / repeat * 1000:9.2f} ms/query")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.query(Product).count() < args.products:
+            seed(db, args.products)
+
+        department = db.query(Category).filter(Category.name == "department-3").one()
+        shelf = db.query(Category).filter(Category.name == "department-3-aisle-4-shelf-2").one()
+
+        timed("ILIKE '%department-3-aisle-4-shelf-2%'", db.query(Product).filter(Product.category.ilike(f"%{shelf.name}%")), args.repeat)
+        timed("exact category_id", db.query(Product).filter(Product.category_id.in_(subtree_ids(shelf, False))), args.repeat)
+        timed("ILIKE '%department-3%' (subtree by text)", db.query(Product).filter(Product.category.ilike(f"%{department.name}%")), args.repeat)
+        timed("materialized-path subtree", db.query(Product).filter(Product.category_id.in_(subtree_ids(department))), args.repeat)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
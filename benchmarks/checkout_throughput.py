@@ -0,0 +1,55 @@
+"""Checkout throughput: synchronous vs. queued (CHECKOUT_MODE=async) checkout.
+
+Start the server once per mode and point the benchmark at it:
+
+    CHECKOUT_MODE=sync  python -m uvicorn app.main:app --port 8000
+    python -m benchmarks.checkout_throughput --base-url http://localhost:8000
+
+    CHECKOUT_MODE=async python -m uvicorn app.main:app --port 8000
+    python -m benchmarks.checkout_throughput --base-url http://localhost:8000
+
+For the async mode both the time until every checkout was accepted (202) and the
+time until the workers settled every order are reported.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import time
+from benchmarks.utils import Timer, create_product, report, signup_and_signin
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    admin = signup_and_signin(args.base_url, role="ADMIN")
+    product_id = create_product(admin, stock=args.users * 10)
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        users = list(pool.map(lambda _: signup_and_signin(args.base_url), range(args.users)))
+        for user in users:
+            user.request("POST", "/cart", {"product_id": product_id, "quantity": 1})
+
+        with Timer() as accepted:
+            results = list(pool.map(lambda user: user.request("POST", "/checkout"), users))
+
+    report("checkout requests answered", len(results), accepted.elapsed)
+
+    queued = [(user, body) for user, (status, body) in zip(users, results) if status == 202]
+    if not queued:
+        return
+
+    pending = dict(enumerate(queued))
+    with Timer() as settled:
+        while pending:
+            for key, (user, body) in list(pending.items()):
+                status, state = user.request("GET", body["status_url"])
+                if state["status"] != "pending":
+                    del pending[key]
+            time.sleep(0.05)
+
+    report("orders settled by workers", len(queued), accepted.elapsed + settled.elapsed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Single-SKU checkout contention: one product row vs. hot-SKU stock buckets.
+
+Runs the stock-decrement transaction of ``checkout`` (order + item + decrement,
+then commit) from many threads against one product, first with regular stock and
+then with the product flagged hot. Use a Postgres DATABASE_URL; SQLite serializes
+all writers and will not show the difference.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.hot_sku_contention --threads 32
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+from app.core.database import SessionLocal
+from app.orders.models import Order, OrderItem, OrderStatus
+from app.products.models import Product
+from app.products.inventory import enable_hot_stock, decrement_hot_stock
+from benchmarks.utils import Timer, report
+
+def create_product(stock: int, hot: bool) -> int:
+    db = SessionLocal()
+    try:
+        product = Product(name="contention-bench", price=1.0, stock=stock, category="bench")
+        db.add(product)
+        db.flush()
+        if hot:
+            enable_hot_stock(db, product)
+        db.commit()
+        return product.id
+    finally:
+        db.close()
+
+def checkout_once(product_id: int, hot: bool) -> bool:
+    db = SessionLocal()
+    try:
+        order = Order(user_id=0, total_amount=1.0, status=OrderStatus.PAID)
+        db.add(order)
+        db.flush()
+        db.add(OrderItem(order_id=order.id, product_id=product_id, quantity=1, price_at_purchase=1.0))
+        if hot:
+            taken = decrement_hot_stock(db, product_id, 1)
+        else:
+            taken = db.query(Product).filter(
+                Product.id == product_id,
+                Product.stock >= 1
+            ).update({Product.stock: Product.stock - 1}, synchronize_session=False)
+        if not taken:
+            db.rollback()
+            return False
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+def run(hot: bool, checkouts: int, threads: int):
+    product_id = create_product(checkouts, hot)
+    with ThreadPoolExecutor(threads) as pool:
+        with Timer() as timer:
+            results = list(pool.map(lambda _: checkout_once(product_id, hot), range(checkouts)))
+    label = "hot-SKU buckets" if hot else "single product row"
+    report(f"{label} ({threads} threads)", sum(results), timer.elapsed)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkouts", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    run(False, args.checkouts, args.threads)
+    run(True, args.checkouts, args.threads)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cold-start profile: per-module import time of ``app.main``.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters, prints the
+slowest modules (self and cumulative time) and the median wall-clock import time.
+With ``--budget-ms`` it exits non-zero when the median exceeds the budget, so it can
+guard cold start in CI:
+
+    python -m benchmarks.import_time --top 25
+    APP_ROUTERS=catalog python -m benchmarks.import_time --budget-ms 800
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+WALL_CLOCK = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+def profile_imports() -> list:
+    """Return (module, self us, cumulative us) for every module imported by app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=os.environ, check=True
+    )
+    return [
+        (match.group(4), int(match.group(1)), int(match.group(2)))
+        for match in map(IMPORT_LINE.match, result.stderr.splitlines()) if match
+    ]
+
+def wall_clock_ms(runs: int) -> list:
+    return [
+        float(subprocess.run([sys.executable, "-c", WALL_CLOCK], capture_output=True, text=True,
+                             env=os.environ, check=True).stdout.strip().splitlines()[-1]) * 1000
+        for _ in range(runs)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    modules = profile_imports()
+    by_package = {}
+    for module, self_us, cumulative_us in modules:
+        package = module.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"{'module':<60} {'self ms':>9} {'cumulative ms':>14}")
+    for module, self_us, cumulative_us in sorted(modules, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{module:<60} {self_us / 1000:9.1f} {cumulative_us / 1000:14.1f}")
+
+    print(f"\n{'top-level package':<60} {'self ms':>9}")
+    for package, self_us in sorted(by_package.items(), key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{package:<60} {self_us / 1000:9.1f}")
+
+    median = statistics.median(wall_clock_ms(args.runs))
+    print(f"\nimport app.main: median {median:.1f} ms over {args.runs} runs ({len(modules)} modules)")
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"Import time budget of {args.budget_ms:.0f} ms exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Warehouse stock updates: one PUT per product vs. batched inventory feed.
+
+Creates a set of products, then applies the same number of stock changes first
+through ``PUT /admin/products/{id}`` one at a time and then through
+``POST /admin/inventory/feed`` in batches, reporting updates per second. A replay
+of the last batch checks that duplicates are skipped.
+
+    python -m uvicorn app.main:app --port 8000 &
+    python -m benchmarks.inventory_feed --products 500 --updates 5000 --batch-size 1000
+"""
+import argparse
+import random
+import uuid
+from benchmarks.utils import Timer, create_product, report, signup_and_signin
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    admin = signup_and_signin(args.base_url, role="ADMIN")
+    product_ids = [create_product(admin, stock=1000) for _ in range(args.products)]
+    single_updates = min(args.updates, 1000)
+
+    with Timer() as single:
+        for _ in range(single_updates):
+            status, body = admin.request("PUT", f"/admin/products/{random.choice(product_ids)}",
+                                         {"stock": random.randint(0, 1000)})
+            assert status == 200, body
+    report("PUT /admin/products/{id}", single_updates, single.elapsed)
+
+    source = f"bench-{uuid.uuid4().hex[:8]}"
+    batch = []
+    with Timer() as feed:
+        for sequence, start in enumerate(range(0, args.updates, args.batch_size), start=1):
+            batch = [
+                {"product_id": random.choice(product_ids), "delta": random.randint(-5, 5)}
+                if index % 2 else
+                {"product_id": random.choice(product_ids), "stock": random.randint(0, 1000)}
+                for index in range(min(args.batch_size, args.updates - start))
+            ]
+            status, body = admin.request("POST", "/admin/inventory/feed",
+                                         {"source": source, "sequence": sequence, "adjustments": batch})
+            assert status == 200 and body["applied"], body
+    report(f"POST /admin/inventory/feed (batch {args.batch_size})", args.updates, feed.elapsed)
+
+    status, body = admin.request("POST", "/admin/inventory/feed",
+                                 {"source": source, "sequence": sequence, "adjustments": batch})
+    assert status == 200 and not body["applied"], body
+    print("replayed batch skipped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cost of pricing a cart with the compiled promotion index.
+
+Reuses the seeded catalog of ``benchmarks.category_filter``, adds --promotions
+rules spread over products, categories and coupons, then reports the index load
+time and the per-cart cost of ``PromotionIndex.price`` for random carts:
+
+    DATABASE_URL=postgresql://.../bench python -m benchmarks.promotions --promotions 5000 --cart-size 20
+"""
+import argparse
+import random
+from sqlalchemy import insert
+from app.core.database import Base, SessionLocal, engine
+from app.categories.models import Category
+from app.products.models import Product
+from app.promotions.engine import PricedLine, PromotionIndex
+from app.promotions.models import Promotion, PromotionKind
+from benchmarks.category_filter import seed
+from benchmarks.utils import Timer
+
+def seed_promotions(db, count: int, product_ids: list, category_ids: list):
+    rows = []
+    for index in range(count):
+        # Mostly product and category rules plus coupons; only a handful of cart-wide ones
+        scope = 2 if index < 3 else (0, 1, 3)[index % 3]
+        kind = random.choice(list(PromotionKind))
+        rows.append({
+            "name": f"bench-{index}",
+            "code": f"BENCH{index}" if scope == 3 else None,
+            "kind": kind,
+            "value": 5 if kind == PromotionKind.FIXED else random.choice([10, 20, 50]),
+            "buy_quantity": 2 if kind == PromotionKind.BUY_X_GET_Y else None,
+            "get_quantity": 1 if kind == PromotionKind.BUY_X_GET_Y else None,
+            "product_id": random.choice(product_ids) if scope == 0 else None,
+            "category_id": random.choice(category_ids) if scope in (1, 3) else None,
+            "priority": random.randint(0, 5),
+        })
+    db.execute(insert(Promotion), rows)
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--promotions", type=int, default=5000)
+    parser.add_argument("--cart-size", type=int, default=20)
+    parser.add_argument("--carts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.query(Product).count() < args.products:
+            seed(db, args.products)
+        products = db.query(Product.id, Product.category_id, Product.price).all()
+        if db.query(Promotion).count() < args.promotions:
+            seed_promotions(db, args.promotions, [row.id for row in products], [row[0] for row in db.query(Category.id)])
+
+        index = PromotionIndex()
+        with Timer() as load:
+            index.load(db)
+        print(f"index load {load.elapsed * 1000:.1f} ms for {args.promotions} promotions")
+
+        carts = [
+            [(row.id, row.category_id, row.price, random.randint(1, 4)) for row in random.sample(products, args.cart_size)]
+            for _ in range(args.carts)
+        ]
+        discounted = 0
+        with Timer() as pricing:
+            for cart in carts:
+                discount, applied = index.price([PricedLine(*line) for line in cart])
+                discounted += bool(applied)
+        print(f"{args.carts} carts of {args.cart_size} lines: {pricing.elapsed / args.carts * 1e6:.1f} us/cart "
+              f"({discounted} with a discount)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
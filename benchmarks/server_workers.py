@@ -0,0 +1,66 @@
+"""Requests per second of ``python -m app.serve`` across worker counts.
+
+Starts the server once per worker count, seeds a product and hammers
+``GET /products/{id}`` and ``GET /products`` from a thread pool for a fixed
+duration, then stops the server with SIGTERM (exercising the graceful drain).
+
+    DATABASE_URL=postgresql://... python -m benchmarks.server_workers --workers 1 2 4 8
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from benchmarks.utils import create_product, report, signup_and_signin
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/docs").read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+def hammer(base_url: str, paths: list, duration: float) -> int:
+    count = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        urllib.request.urlopen(base_url + paths[count % len(paths)]).read()
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers)],
+            env=dict(os.environ, SERVER_GRACEFUL_TIMEOUT_SECONDS="10")
+        )
+        try:
+            wait_until_ready(base_url)
+            admin = signup_and_signin(base_url, role="ADMIN")
+            product_id = create_product(admin, stock=10)
+            paths = [f"/products/{product_id}", "/products?sort_by=price"]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                total = sum(pool.map(lambda _: hammer(base_url, paths, args.duration), range(args.clients)))
+            report(f"{workers} worker(s), {args.clients} clients", total, time.perf_counter() - start)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+if __name__ == "__main__":
+    main()
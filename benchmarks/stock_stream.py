@@ -0,0 +1,71 @@
+"""Fan-out latency of ``GET /products/stream`` with many idle connections.
+
+Opens ``--connections`` SSE streams on one product, then updates its price
+``--updates`` times through ``PUT /admin/products/{id}`` and measures how long
+each change takes to reach every connection. Raise the open-files limit first
+(``ulimit -n``) when going past a thousand connections.
+
+    python -m uvicorn app.main:app --port 8000 &
+    python -m benchmarks.stock_stream --connections 5000 --updates 20
+"""
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import statistics
+import time
+from benchmarks.utils import create_product, signup_and_signin
+
+async def open_stream(host: str, port: int, product_id: int):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /products/stream?ids={product_id} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    await read_event(reader)  # the current values
+    return reader, writer
+
+async def read_event(reader) -> str:
+    """Read up to the next `data:` line (chunked framing and heartbeats are skipped)"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Stream closed")
+        if line.startswith(b"data:"):
+            return line.decode()
+
+async def run(args):
+    admin = signup_and_signin(args.base_url, role="ADMIN")
+    product_id = create_product(admin, stock=1000)
+    url = urlsplit(args.base_url)
+
+    streams = []
+    start = time.perf_counter()
+    for offset in range(0, args.connections, 500):
+        streams += await asyncio.gather(*[
+            open_stream(url.hostname, url.port or 80, product_id)
+            for _ in range(min(500, args.connections - offset))
+        ])
+    print(f"{len(streams)} streams open in {time.perf_counter() - start:.2f}s")
+
+    latencies = []
+    for update in range(args.updates):
+        readers = [asyncio.ensure_future(read_event(reader)) for reader, writer in streams]
+        sent = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(
+            None, admin.request, "PUT", f"/admin/products/{product_id}", {"price": 10.0 + update + 1}
+        )
+        await asyncio.gather(*readers)
+        latencies.append(time.perf_counter() - sent)
+
+    print(f"update -> all {len(streams)} streams: "
+          f"p50 {statistics.median(latencies) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    for reader, writer in streams:
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
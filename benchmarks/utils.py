@@ -0,0 +1,61 @@
+"""Small stdlib HTTP helpers shared by the benchmark scripts.
+
+The benchmarks talk to a running server (``python -m uvicorn app.main:app``) so
+that they measure the real request path, including the database.
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+class ApiClient:
+    def __init__(self, base_url: str, token: str = None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+
+    def request(self, method: str, path: str, body: dict = None, headers: dict = None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        for name, value in (headers or {}).items():
+            request.add_header(name, value)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read() or b"null")
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"null")
+
+def signup_and_signin(base_url: str, role: str = "USER") -> ApiClient:
+    """Create a throwaway account and return a client authenticated as it"""
+    client = ApiClient(base_url)
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    client.request("POST", "/auth/signup", {"name": "bench", "email": email, "password": "benchmark", "role": role})
+    status, body = client.request("POST", "/auth/signin", {"email": email, "password": "benchmark"})
+    if status != 200:
+        raise RuntimeError(f"Signin failed: {status} {body}")
+    return ApiClient(base_url, body["access_token"])
+
+def create_product(admin: ApiClient, stock: int, price: float = 10.0, category: str = "bench", name: str = None) -> int:
+    status, body = admin.request("POST", "/admin/products", {
+        "name": name or f"bench-{uuid.uuid4().hex[:8]}",
+        "price": price,
+        "stock": stock,
+        "category": category,
+    })
+    if status != 201:
+        raise RuntimeError(f"Product creation failed: {status} {body}")
+    return body["id"]
+
+def report(label: str, count: int, elapsed: float):
+    print(f"{label:<40} {count:>7} ops in {elapsed:8.3f}s  ->  {count / elapsed:10.1f} ops/s")
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before app.core.config is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+from app.main import app
+from app.core.database import Base, SessionLocal, engine
+
+@pytest.fixture(scope="session", autouse=True)
+def create_tables():
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
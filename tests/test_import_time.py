@@ -0,0 +1,16 @@
+from benchmarks.import_time import profile_imports
+import os
+import statistics
+
+# Cold-start budget for `import app.main`, measured under -X importtime (which adds some overhead)
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+RUNS = int(os.getenv("IMPORT_TIME_RUNS", "5"))
+
+def test_app_import_stays_under_budget():
+    timings = []
+    for _ in range(RUNS):
+        cumulative = {module: cumulative_us for module, self_us, cumulative_us in profile_imports()}
+        timings.append(cumulative["app.main"] / 1000)
+
+    median = statistics.median(timings)
+    assert median < BUDGET_MS, f"import app.main took {median:.0f} ms (median of {RUNS}), budget {BUDGET_MS:.0f} ms"
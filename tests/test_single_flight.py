@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from app.core.database import engine
+from app.core.singleflight import SingleFlight
+from app.main import app
+from app.products.models import Product
+from app.products.routes import fetch_product
+import asyncio
+import httpx
+import pytest
+
+@pytest.fixture
+def product_id(db):
+    product = Product(name="Coalesced", price=9.99, stock=5, category="Misc")
+    db.add(product)
+    db.commit()
+    yield product.id
+    db.delete(product)
+    db.commit()
+
+@pytest.fixture
+def product_selects():
+    """SELECT statements against the products table issued while the test runs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM products" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+def test_concurrent_fetches_issue_one_query(product_id, product_selects):
+    flight = SingleFlight("test-product")
+
+    async def fetch_concurrently():
+        return await asyncio.gather(*[flight.do(product_id, fetch_product, 0, product_id) for _ in range(50)])
+
+    results = asyncio.run(fetch_concurrently())
+
+    assert len(product_selects) == 1
+    assert all(result.id == product_id and result.name == "Coalesced" for result in results)
+    assert flight.stats() == {"name": "test-product", "calls": 1, "coalesced": 49, "in_flight": 0}
+
+def test_concurrent_product_requests_issue_one_query(product_id, product_selects):
+    async def request_concurrently():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[client.get(f"/products/{product_id}") for _ in range(20)])
+
+    responses = asyncio.run(request_concurrently())
+
+    assert [response.status_code for response in responses] == [200] * 20
+    assert len(product_selects) == 1
+
+def test_sequential_fetches_are_not_cached(product_id, product_selects):
+    flight = SingleFlight("test-sequential")
+
+    async def fetch_twice():
+        await flight.do(product_id, fetch_product, 0, product_id)
+        await flight.do(product_id, fetch_product, 0, product_id)
+
+    asyncio.run(fetch_twice())
+
+    assert len(product_selects) == 2